@@ -39,6 +39,7 @@ if TYPE_CHECKING:
     from aiotieba.api.get_bawu_postlogs._classdef import Postlogs
     from aiotieba.api.get_bawu_userlogs._classdef import Userlogs
     from aiotieba.api.get_follow_forums._classdef import FollowForums
+    from aiotieba.api.get_images._classdef import ImageBytes
     from aiotieba.api.get_tab_map._classdef import TabMap
     from aiotieba.api.get_user_contents._classdef import UserPostss, UserThreads
     from aiotieba.api.tieba_uid2user_info._classdef import UserInfo_TUid
@@ -131,6 +132,7 @@ class Client(tb.Client):  # type: ignore[misc]
         retry_attempts: int = 3,
         wait_initial: float = 0.5,
         wait_max: float = 5.0,
+        max_image_concurrency: int = 16,
         **kwargs: Any,
     ):
         """初始化扩展的aiotieba客户端。
@@ -140,8 +142,14 @@ class Client(tb.Client):  # type: ignore[misc]
             limiter: 速率限制器，用于控制每秒请求数。
             semaphore: 信号量，用于控制最大并发数。
             cooldown_seconds: 触发429时的全局冷却秒数。
+            max_image_concurrency: 图片下载的最大并发数，避免批量渲染时触发图床限流。
             **kwargs: 传递给父类构造函数的关键字参数。
+
+        Raises:
+            ValueError: max_image_concurrency 小于 1。
         """
+        if max_image_concurrency < 1:
+            raise ValueError(f"max_image_concurrency must be at least 1, got {max_image_concurrency}")
         super().__init__(*args, **kwargs)
         self._limiter = limiter
         self._semaphore = semaphore
@@ -151,6 +159,7 @@ class Client(tb.Client):  # type: ignore[misc]
         self._retry_attempts = retry_attempts
         self._wait_initial = wait_initial
         self._wait_max = wait_max
+        self._image_semaphore = asyncio.Semaphore(max_image_concurrency)
 
     async def __aenter__(self) -> Client:
         proxy: ProxyConfig = self._proxy
@@ -457,6 +466,12 @@ class Client(tb.Client):  # type: ignore[misc]
     async def get_tab_map(self, fname_or_fid: str | int) -> TabMap:
         return await super().get_tab_map(fname_or_fid)
 
+    # 获取图片 #
+
+    async def get_image_bytes(self, img_url: str) -> ImageBytes:
+        async with self._image_semaphore:
+            return await super().get_image_bytes(img_url)
+
     # 吧务查询 #
 
     @with_ensure
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 from datetime import datetime
-from functools import cached_property
+from functools import cached_property, partial
 from types import UnionType
-from typing import Any, Literal, Self, get_args, get_origin
+from typing import TYPE_CHECKING, Any, Literal, Self, get_args, get_origin
+from weakref import WeakKeyDictionary
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 from ..schemas.fragments import FragAtModel, FragImageModel, Fragment, TypeFragText
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+# 各 DTO 类的字段零值工厂缓存，首次补全时按类解析一次类型注解
+_ZERO_FACTORIES: WeakKeyDictionary[type[BaseDTO], dict[str, Callable[[], Any]]] = WeakKeyDictionary()
+
+# 各 DTO 类的列表校验器缓存，批量构造时整个列表交给 pydantic-core 一次校验
+_LIST_ADAPTERS: WeakKeyDictionary[type[BaseDTO], TypeAdapter[list[Any]]] = WeakKeyDictionary()
+
 
 class BaseDTO(BaseModel):
     """
@@ -30,12 +40,36 @@ class BaseDTO(BaseModel):
         Returns:
             补全后的 DTO 实例。
         """
+        return cls.model_validate(cls._fill_missing(data))
+
+    @classmethod
+    def from_incomplete_list(cls, items: Iterable[dict[str, Any] | BaseModel | None]) -> list[Self]:
+        """
+        批量补全不完整的数据源并返回 DTO 实例列表。
+
+        与逐个调用 from_incomplete_data 结果一致，但整个列表只进行一次校验。
+
+        Args:
+            items: 不完整的数据源序列，元素可以是字典或 Pydantic 模型实例。
+        Returns:
+            补全后的 DTO 实例列表。
+        """
+        adapter = _LIST_ADAPTERS.get(cls)
+        if adapter is None:
+            adapter = TypeAdapter(list[cls])  # type: ignore[valid-type]
+            _LIST_ADAPTERS[cls] = adapter
+        return adapter.validate_python([cls._fill_missing(item) for item in items])
+
+    @classmethod
+    def _fill_missing(cls, data: dict[str, Any] | BaseModel | None) -> dict[str, Any]:
+        """补全数据源中缺失或为 None 的字段，返回待校验的字典。"""
         if data is None:
             data = {}
         if isinstance(data, BaseModel):
             data = data.model_dump()
 
         input_payload = data.copy()
+        factories = cls._zero_factories()
 
         for field_name, field_info in cls.model_fields.items():
             field_type = field_info.annotation
@@ -44,7 +78,7 @@ class BaseDTO(BaseModel):
                 curr_value = input_payload[field_name]
 
                 if curr_value is None:
-                    zero_val = cls._get_zero_value(field_type)
+                    zero_val = factories[field_name]()
                     if zero_val is not None:
                         input_payload[field_name] = zero_val
                         curr_value = zero_val
@@ -56,7 +90,7 @@ class BaseDTO(BaseModel):
                         input_payload[field_name] = field_type.from_incomplete_data(curr_value)
                     # 处理没有继承 BaseDTO 的普通 Pydantic 模型
                     else:
-                        zero_obj = cls._get_zero_value(field_type)
+                        zero_obj = factories[field_name]()
                         # 用传入的 value 覆盖 zero_obj
                         if isinstance(zero_obj, BaseModel):
                             merged_data = zero_obj.model_dump()
@@ -64,9 +98,28 @@ class BaseDTO(BaseModel):
                             input_payload[field_name] = field_type.model_validate(merged_data)
 
             else:
-                input_payload[field_name] = cls._get_zero_value(field_type)
+                input_payload[field_name] = factories[field_name]()
 
-        return cls.model_validate(input_payload)
+        return input_payload
+
+    @classmethod
+    def _zero_factories(cls) -> dict[str, Callable[[], Any]]:
+        """获取各字段的零值工厂，仅在类首次使用时解析类型注解。"""
+        factories = _ZERO_FACTORIES.get(cls)
+        if factories is None:
+            factories = {name: cls._zero_factory(f.annotation) for name, f in cls.model_fields.items()}
+            _ZERO_FACTORIES[cls] = factories
+        return factories
+
+    @classmethod
+    def _zero_factory(cls, field_type: Any) -> Callable[[], Any]:
+        """根据类型注解生成零值工厂，可变零值每次调用都返回新对象。"""
+        zero = cls._get_zero_value(field_type)
+        if isinstance(zero, list | dict | set):
+            return type(zero)
+        if isinstance(zero, BaseModel):
+            return partial(cls._get_zero_value, field_type)
+        return lambda: zero
 
     @classmethod
     def _get_zero_value(cls, field_type: Any) -> Any:
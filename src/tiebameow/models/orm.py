@@ -7,9 +7,9 @@
 from __future__ import annotations
 
 from datetime import datetime  # noqa: TC003
-from typing import TYPE_CHECKING, Any, cast
+from typing import TYPE_CHECKING, Annotated, Any, ClassVar, cast
 
-from pydantic import TypeAdapter, ValidationError
+from pydantic import Field, TypeAdapter, ValidationError
 from sqlalchemy import BIGINT, JSON, Boolean, DateTime, Enum, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.mutable import MutableList
@@ -60,6 +60,10 @@ class FragmentListType(TypeDecorator[list[Fragment]]):
     def __init__(self, fallback: Callable[[], Fragment] | None = None, *args: object, **kwargs: object):
         super().__init__(*args, **kwargs)
         self.adapter: TypeAdapter[Fragment] = TypeAdapter(Fragment)
+        # 整个列表一次性交给 pydantic-core 序列化与校验，按 type 字段直接分派，避免逐项调用的 Python 层开销
+        self.list_adapter: TypeAdapter[list[Fragment]] = TypeAdapter(
+            list[Annotated[Fragment, Field(discriminator="type")]]
+        )
         self.fallback = fallback
 
     def load_dialect_impl(self, dialect: Dialect) -> TypeEngine[Any]:
@@ -70,12 +74,16 @@ class FragmentListType(TypeDecorator[list[Fragment]]):
     def process_bind_param(self, value: list[Fragment] | None, dialect: Dialect) -> list[dict[str, Any]] | None:
         if value is None:
             return None
-        return [self.adapter.dump_python(item, mode="json") for item in value]
+        return cast("list[dict[str, Any]]", self.list_adapter.dump_python(value, mode="json"))
 
     def process_result_value(self, value: list[dict[str, Any]] | None, dialect: Dialect) -> list[Fragment] | None:
         if value is None:
             return None
-        return [self._validate(item) for item in value]
+        try:
+            return self.list_adapter.validate_python(value)
+        except ValidationError:
+            # 含旧版类型标识或不完整的数据时逐项处理
+            return [self._validate(item) for item in value]
 
     def _validate(self, item: dict[str, Any]) -> Fragment:
         if "type" in item:
@@ -179,6 +187,14 @@ class MixinBase(Base):
 
     __abstract__ = True
 
+    # 映射表的列名，在子类映射完成后计算一次，避免每次 to_dict 都遍历表结构
+    _column_names: ClassVar[tuple[str, ...]] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "__table__" in cls.__dict__:
+            cls._column_names = tuple(c.name for c in cls.__table__.columns)
+
     def to_dict(self) -> dict[str, Any]:
         """将模型实例的列数据转换为字典。
 
@@ -187,11 +203,7 @@ class MixinBase(Base):
         Returns:
             dict: 包含模型列名和对应值的字典。
         """
-        result = {}
-        for c in self.__table__.columns:
-            value = getattr(self, c.name)
-            result[c.name] = value
-        return result
+        return {name: getattr(self, name) for name in self._column_names}
 
 
 class Forum(MixinBase):
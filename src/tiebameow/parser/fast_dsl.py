@@ -0,0 +1,164 @@
+"""
+DSL 规则的手写递归下降解析器。
+
+仅覆盖 DSL 中最常见的写法：标准字段、符号/单词操作符、数字、布尔值、不含转义的引号字符串、
+扁平列表，以及 AND/OR/NOT 与括号组合。子集之外的任何输入 (函数调用、时间、中文标点、
+转义字符、语法错误等) 都返回 None，交由 pyparsing 语法完成解析和报错，
+因此凡是本模块给出的结果都与 pyparsing 的解析结果一致。
+"""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING, Any
+
+from ..schemas.rules import Condition, LogicType, RuleGroup
+
+if TYPE_CHECKING:
+    from ..schemas.rules import RuleNode
+    from .rule_parser import LangConfig
+
+# 单个 Token；空白字符与 pyparsing 默认跳过的集合保持一致
+_TOKEN_RE = re.compile(
+    r"""[ \t\r\n]*(?:
+        (?P<number>[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?)
+        |(?P<string>"[^"\\\r\n]*"|'[^'\\\r\n]*')
+        |(?P<op>==|!=|>=|<=|>|<)
+        |(?P<punct>[()\[\],])
+        |(?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+
+# 输入末尾允许的空白
+_TRAILING_WS_RE = re.compile(r"[ \t\r\n]*\Z")
+
+
+class _UnsupportedSyntaxError(Exception):
+    """输入超出快速解析支持的子集，需要回退到 pyparsing。"""
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    """将输入切分为 (类别, 文本) 形式的 Token 列表。"""
+    tokens: list[tuple[str, str]] = []
+    pos = 0
+    while not _TRAILING_WS_RE.match(text, pos):
+        m = _TOKEN_RE.match(text, pos)
+        if m is None or m.lastgroup is None:
+            raise _UnsupportedSyntaxError
+        tokens.append((m.lastgroup, m.group(m.lastgroup)))
+        pos = m.end()
+    return tokens
+
+
+class _DSLParser:
+    """
+    基于 Token 列表的递归下降解析器。
+
+    优先级与 pyparsing infix_notation 的配置一致：NOT > AND > OR，
+    同级的 AND/OR 折叠为同一个 RuleGroup，括号内的表达式保持为独立节点。
+    """
+
+    def __init__(self, tokens: list[tuple[str, str]], cfg: LangConfig) -> None:
+        self._tokens = tokens
+        self._pos = 0
+        self._cfg = cfg
+
+    def _peek(self) -> tuple[str, str] | None:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else None
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise _UnsupportedSyntaxError
+        self._pos += 1
+        return token
+
+    def _peek_logic(self) -> LogicType | None:
+        token = self._peek()
+        if token is None or token[0] != "word":
+            return None
+        return self._cfg.logic.get_enum(token[1])
+
+    def parse(self) -> RuleNode:
+        node = self._parse_or()
+        if self._peek() is not None:
+            raise _UnsupportedSyntaxError
+        return node
+
+    def _parse_or(self) -> RuleNode:
+        operands = [self._parse_and()]
+        while self._peek_logic() == LogicType.OR:
+            self._pos += 1
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else RuleGroup(logic=LogicType.OR, conditions=operands)
+
+    def _parse_and(self) -> RuleNode:
+        operands = [self._parse_not()]
+        while self._peek_logic() == LogicType.AND:
+            self._pos += 1
+            operands.append(self._parse_not())
+        return operands[0] if len(operands) == 1 else RuleGroup(logic=LogicType.AND, conditions=operands)
+
+    def _parse_not(self) -> RuleNode:
+        if self._peek_logic() == LogicType.NOT:
+            self._pos += 1
+            return RuleGroup(logic=LogicType.NOT, conditions=[self._parse_not()])
+        if self._peek() == ("punct", "("):
+            self._pos += 1
+            node = self._parse_or()
+            if self._next() != ("punct", ")"):
+                raise _UnsupportedSyntaxError
+            return node
+        return self._parse_condition()
+
+    def _parse_condition(self) -> Condition:
+        kind, raw_field = self._next()
+        field = self._cfg.fields.get_enum(raw_field) if kind == "word" else None
+        kind, raw_op = self._next()
+        op = self._cfg.operators.get_enum(raw_op) if kind in ("op", "word") else None
+        if field is None or op is None:
+            raise _UnsupportedSyntaxError
+
+        if self._peek() == ("punct", "["):
+            self._pos += 1
+            items = [self._parse_scalar()]
+            while (token := self._next()) == ("punct", ","):
+                items.append(self._parse_scalar())
+            if token != ("punct", "]"):
+                raise _UnsupportedSyntaxError
+            return Condition(field=field, operator=op, value=items)
+        return Condition(field=field, operator=op, value=self._parse_scalar())
+
+    def _parse_scalar(self) -> Any:
+        kind, raw = self._next()
+        if kind == "number":
+            return float(raw) if any(c in raw for c in ".eE") else int(raw)
+        if kind == "string":
+            content = raw[1:-1]
+            # 形似日期 (数字开头且含日期分隔符) 的字符串可能被转换为 datetime，交由完整语法处理
+            stripped = content.replace("T", " ").strip()
+            if stripped[:1].isdigit() and ("-" in stripped or "年" in stripped):
+                raise _UnsupportedSyntaxError
+            return content
+        if kind == "word" and (bool_enum := self._cfg.booleans.get_enum(raw)) is not None:
+            # BooleanType 为 StrEnum，直接与其值比较以避免循环导入 rule_parser
+            return bool_enum == "TRUE"
+        raise _UnsupportedSyntaxError
+
+
+def parse_dsl(text: str, cfg: LangConfig) -> RuleNode | None:
+    """
+    尝试快速解析 DSL 规则字符串。
+
+    Args:
+        text: 待解析的规则字符串。
+        cfg: DSL 语言配置。
+
+    Returns:
+        RuleNode | None: 解析成功返回规则节点；输入超出支持的子集时返回 None。
+    """
+    try:
+        return _DSLParser(_tokenize(text), cfg).parse()
+    except _UnsupportedSyntaxError:
+        return None
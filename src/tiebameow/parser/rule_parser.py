@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import operator
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import StrEnum, unique
-from typing import TYPE_CHECKING, Any, Literal, cast
+from typing import TYPE_CHECKING, Any, ClassVar, Literal, cast
 
 import pyparsing as pp
 
@@ -21,6 +23,7 @@ from ..schemas.rules import (
     RuleNode,
 )
 from ..utils.time_utils import now_with_tz
+from .fast_dsl import parse_dsl
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -325,6 +328,44 @@ CNL_CONFIG = LangConfig.create(
 )
 
 
+# 已解析规则缓存的最大条目数
+_RULE_CACHE_SIZE = 4096
+
+# 单次 parse_rule 内共享的当前时间，使同一规则中的多个相对时间基于同一时刻计算
+_parse_local = threading.local()
+
+
+def _parse_now() -> datetime:
+    """获取当前解析所使用的时间，解析期间首次获取后即缓存。"""
+    now: datetime | None = getattr(_parse_local, "now", None)
+    if now is None:
+        now = now_with_tz()
+        if getattr(_parse_local, "active", False):
+            _parse_local.now = now
+    return now
+
+
+# 相对时间的数值与单位，DSL 单位紧跟数字，CNL 单位与数字、后缀"前"之间均允许有空格
+_RELATIVE_TIME_RE = re.compile(
+    r"(?P<amount>\d+)(?:(?P<dsl_unit>[dhms])|\s*(?P<cnl_unit>分钟|小时|天|时|分|秒)\s*前?)",
+    re.IGNORECASE,
+)
+
+# 相对时间单位到 timedelta 参数名的映射
+_RELATIVE_TIME_UNITS = {
+    "d": "days",
+    "天": "days",
+    "h": "hours",
+    "小时": "hours",
+    "时": "hours",
+    "m": "minutes",
+    "分": "minutes",
+    "分钟": "minutes",
+    "s": "seconds",
+    "秒": "seconds",
+}
+
+
 class RuleEngineParser:
     """
     基于规则的 DSL/CNL 解析引擎。
@@ -336,17 +377,28 @@ class RuleEngineParser:
 
     Attributes:
         _parsers: 缓存不同模式 (dsl/cnl) 下的 pyparsing 解析对象 (trigger_parser, action_parser)。
+        _rule_cache: 按 (规则文本, 模式) 缓存的已解析规则，按 LRU 淘汰。
+        _rule_cache_lock: 保护 _rule_cache 的锁，使同一解析引擎可在多线程间共享。
     """
 
+    # 语法解析器不依赖实例状态，每个类在进程内只构建一次，由所有实例共享
+    _shared_parsers: ClassVar[dict[str, tuple[pp.ParserElement, pp.ParserElement]]]
+
     def __init__(self) -> None:
         """
         初始化解析引擎。
 
-        预先构建 DSL 和 CNL 的语法解析器以提高后续解析性能。
+        首次实例化时构建 DSL 和 CNL 的语法解析器，之后的实例直接复用。
         """
-        self._parsers: dict[str, tuple[pp.ParserElement, pp.ParserElement]] = {}
-        self._parsers["dsl"] = (self._build_trigger_grammar(DSL_CONFIG), self._build_action_grammar(DSL_CONFIG))
-        self._parsers["cnl"] = (self._build_trigger_grammar(CNL_CONFIG), self._build_action_grammar(CNL_CONFIG))
+        cls = type(self)
+        if "_shared_parsers" not in cls.__dict__:
+            cls._shared_parsers = {
+                "dsl": (self._build_trigger_grammar(DSL_CONFIG), self._build_action_grammar(DSL_CONFIG)),
+                "cnl": (self._build_trigger_grammar(CNL_CONFIG), self._build_action_grammar(CNL_CONFIG)),
+            }
+        self._parsers = cls._shared_parsers
+        self._rule_cache: OrderedDict[tuple[str, str], RuleNode] = OrderedDict()
+        self._rule_cache_lock = threading.Lock()
 
     def _build_value_parser(self, cfg: LangConfig) -> pp.ParserElement:
         """
@@ -378,7 +430,7 @@ class RuleEngineParser:
             for fmt in fmt_list:
                 try:
                     dt = datetime.strptime(val, fmt)
-                    return dt.replace(tzinfo=now_with_tz().tzinfo)
+                    return dt.replace(tzinfo=_parse_now().tzinfo)
                 except ValueError:
                     continue
             return None
@@ -407,64 +459,25 @@ class RuleEngineParser:
 
         iso_date.set_parse_action(parse_iso)
 
-        # 2. 相对时间处理函数
-        def parse_relative_time(amount: str | int, unit: str, direction: str = "ago") -> datetime:
-            """计算相对时间，例如 '3d' -> now - 3 days"""
-            now = now_with_tz()
-            val = int(amount)
-
-            delta_args = {}
-            if unit.lower() in ("d", "天"):
-                delta_args["days"] = val
-            elif unit.lower() in ("h", "小时", "时"):
-                delta_args["hours"] = val
-            elif unit.lower() in ("m", "分", "分钟"):
-                delta_args["minutes"] = val
-            elif unit.lower() in ("s", "秒"):
-                delta_args["seconds"] = val
-
-            delta = timedelta(**delta_args)
+        # 2. 相对时间 (DSL: 纯数字 + d/h/m/s 无空格；CNL: 纯数字 + 中文单位 + 可选"前")
+        # 单个正则一次匹配，取代逐个尝试的 pyparsing 备选分支
+        relative_time = pp.Regex(_RELATIVE_TIME_RE).set_name("relative_time")
 
+        def parse_relative_time(t: pp.ParseResults) -> datetime:
+            """计算相对时间，例如 '3d' -> now - 3 days"""
+            amount = int(t["amount"])
+            unit = _RELATIVE_TIME_UNITS[(t["dsl_unit"] or t["cnl_unit"]).lower()]
             # 逻辑：'3天前' 或 '3d' (默认ago) -> now - delta
-            # 如果未来支持 '3天后' 可以判断 direction
-            return now - delta
-
-        # 匹配 DSL: 纯数字 + d/h/m/s (无空格)
-        dsl_unit = pp.one_of("d h m s", caseless=True)
-        relative_dsl = pp.Group(pp.Combine(pp.Word(pp.nums) + dsl_unit)).set_name("relative_dsl")
-
-        def action_dsl(t: Any) -> datetime:
-            # t[0] 是 Group 里的内容，如 "10d"
-            full_str = t[0][0]
-            unit = full_str[-1]
-            amount = full_str[:-1]
-            return parse_relative_time(amount, unit)
-
-        relative_dsl.set_parse_action(action_dsl)
-
-        # 匹配 CNL: 纯数字 + 中文单位 + (可选"前")
-        cnl_unit = pp.one_of("天 小时 时 分 分钟 秒")
-        # 允许数字和单位间有空格，允许后缀"前"
-        relative_cnl = pp.Group(pp.Word(pp.nums) + pp.Optional(pp.White()) + cnl_unit + pp.Optional("前")).set_name(
-            "relative_cnl"
-        )
+            # 如果未来支持 '3天后' 可以判断后缀
+            return _parse_now() - timedelta(**{unit: amount})
 
-        def action_cnl(t: Any) -> datetime:
-            # t[0] 是一个 list，例如 ['3', '天'] 或 ['3', ' ', '天', '前']
-            # 取出数字和单位，忽略空格和后缀
-            parsed_list = t[0].as_list()
-            amount = parsed_list[0]
-            # 找到单位 (在 list 中找到属于 cnl_unit 候选词的项)
-            unit = next(item for item in parsed_list[1:] if item.strip() and item != "前")
-            return parse_relative_time(amount, unit)
-
-        relative_cnl.set_parse_action(action_cnl)
+        relative_time.set_parse_action(parse_relative_time)
 
         # 3. 关键字 NOW
-        now_keyword = pp.CaselessLiteral("NOW").set_parse_action(lambda: now_with_tz())
+        now_keyword = pp.CaselessLiteral("NOW").set_parse_action(lambda: _parse_now())
 
         # 组合时间解析器
-        datetime_expr = iso_date | relative_dsl | relative_cnl | now_keyword
+        datetime_expr = iso_date | relative_time | now_keyword
 
         # 数字 (优先匹配浮点，再匹配整数)
         number = pp.common.number.set_parse_action(operator.itemgetter(0))
@@ -892,7 +905,7 @@ class RuleEngineParser:
 
         return actions
 
-    def parse_rule(self, text: str, mode: Literal["dsl", "cnl"] = "dsl") -> RuleNode:
+    def parse_rule(self, text: str, mode: Literal["dsl", "cnl"] = "dsl", now: datetime | None = None) -> RuleNode:
         """
         解析规则触发器字符串。
 
@@ -901,6 +914,7 @@ class RuleEngineParser:
         Args:
             text: 待解析的规则字符串。
             mode: 解析模式，可选 "dsl" (默认) 或 "cnl"。
+            now: 相对时间与 NOW 的计算基准，默认在解析中首次用到时取当前时间。
 
         Returns:
             RuleNode: 解析生成的规则节点对象。
@@ -908,15 +922,45 @@ class RuleEngineParser:
         Raises:
             ValueError: 当语法无法匹配或发生解析错误时抛出。
         """
+        key = (text, mode)
+        if now is None:
+            # 查找与调整 LRU 顺序须在同一临界区内，以免其他线程在两者之间淘汰该条目
+            with self._rule_cache_lock:
+                cached = self._rule_cache.get(key)
+                if cached is not None:
+                    self._rule_cache.move_to_end(key)
+            if cached is not None:
+                # 规则模型可变，返回副本以免调用方修改污染缓存
+                return cached.model_copy(deep=True)
+
         parser, _ = self._parsers[mode]
         cfg = DSL_CONFIG if mode == "dsl" else CNL_CONFIG
-        try:
-            # parse_string(parse_all=True) 确保完全匹配
-            res = parser.parse_string(text, parse_all=True)[0]
-            return self._to_rule_node(res, cfg)
-        except pp.ParseException as e:
-            # 增强错误提示：可视化指出错误位置
-            raise ValueError(f"Parsing failed at position {e.col}:\n{e.line}\n{' ' * (e.col - 1)}^\n{e}") from e
+        # 常见 DSL 写法先经手写解析器处理，超出其支持范围时 (返回 None) 再使用完整语法
+        node = parse_dsl(text, cfg) if mode == "dsl" else None
+        cacheable = True
+        if node is None:
+            _parse_local.active = True
+            _parse_local.now = now
+            try:
+                # parse_string(parse_all=True) 确保完全匹配
+                res = parser.parse_string(text, parse_all=True)[0]
+                node = self._to_rule_node(res, cfg)
+                # 解析结果依赖当前时间 (相对时间、NOW 等) 时不缓存
+                cacheable = _parse_local.now is None
+            except pp.ParseException as e:
+                # 增强错误提示：可视化指出错误位置
+                raise ValueError(f"Parsing failed at position {e.col}:\n{e.line}\n{' ' * (e.col - 1)}^\n{e}") from e
+            finally:
+                _parse_local.active = False
+                _parse_local.now = None
+
+        if cacheable:
+            snapshot = node.model_copy(deep=True)
+            with self._rule_cache_lock:
+                self._rule_cache[key] = snapshot
+                if len(self._rule_cache) > _RULE_CACHE_SIZE:
+                    self._rule_cache.popitem(last=False)
+        return node
 
     def parse_actions(self, text: str, mode: Literal["dsl", "cnl"] = "dsl") -> Actions:
         """
@@ -999,109 +1043,141 @@ class RuleEngineParser:
             str: 生成的规则字符串。
         """
         cfg = DSL_CONFIG if mode == "dsl" else CNL_CONFIG
+        # 各层片段写入同一列表，最后一次性拼接，避免嵌套层级逐层复制中间字符串
+        out: list[str] = []
+        self._dump_node(node, cfg, out)
+        return "".join(out)
 
+    def _dump_node(self, node: RuleNode, cfg: LangConfig, out: list[str]) -> None:
+        """
+        递归地将规则节点的字符串片段写入 out。
+
+        Args:
+            node: 待序列化的规则节点。
+            cfg: 当前语言配置。
+            out: 输出片段列表。
+
+        Raises:
+            ValueError: 如果节点类型未知。
+        """
         if isinstance(node, Condition):
-            if isinstance(node.field, FunctionCall):
-                call = node.field
-                arg_strs = []
-                comma = cfg.punctuation.get_primary_token(PunctuationType.COMMA) + " "
-                assign = cfg.punctuation.get_primary_token(PunctuationType.ASSIGN)
-
-                # 简易值序列化 helper (复用下方 value 逻辑的部分简化版)
-                def dump_v(v: Any) -> str:
-                    if isinstance(v, FunctionCall):
-                        inner_args: list[str] = []
-                        inner_args.extend([dump_v(a) for a in v.args])
-                        for k, val in v.kwargs.items():
-                            inner_args.append(f"{k}{assign}{dump_v(val)}")
-                        inner_params = comma.join(inner_args)
-                        lpar = cfg.punctuation.get_primary_token(PunctuationType.LPAR)
-                        rpar = cfg.punctuation.get_primary_token(PunctuationType.RPAR)
-                        return f"{v.name}{lpar}{inner_params}{rpar}"
-                    if isinstance(v, str):
-                        return f'"{v}"'
-                    if isinstance(v, bool):
-                        return "true" if v else "false"
-                    return str(v)
-
-                arg_strs.extend([dump_v(a) for a in call.args])
-                for k, v in call.kwargs.items():
-                    arg_strs.append(f"{k}{assign}{dump_v(v)}")
-
-                params_str = comma.join(arg_strs)
-                lpar = cfg.punctuation.get_primary_token(PunctuationType.LPAR)
-                rpar = cfg.punctuation.get_primary_token(PunctuationType.RPAR)
-                field_str = f"{call.name}{lpar}{params_str}{rpar}"
-
-            else:
-                # 将 str 值转回 Enum 以查找 Token
-                try:
-                    f_enum = FieldType(node.field)
-                except ValueError:
-                    f_enum = None
-
-                # 如果是预定义的字段，用主Token，否则原样返回
-                field_str = cfg.fields.get_primary_token(f_enum) if f_enum else str(node.field)
-
-            # Op 必须是规范的
-            o_enum = OperatorType(node.operator)
-            op_str = cfg.operators.get_primary_token(o_enum)
-
-            val = node.value
-
-            if isinstance(val, datetime):
-                # 格式：2023-01-01 12:00:00
-                val_str = val.strftime("%Y-%m-%d %H:%M:%S")
-                # 如果是整天，去掉时间部分让看起来更干净
-                if val.hour == 0 and val.minute == 0 and val.second == 0:
-                    val_str = val.strftime("%Y-%m-%d")
-            elif isinstance(val, str):
-                # CNL 模式下也可以根据喜好改用中文引号，这里默认使用双引号以保持 JSON 兼容性
-                val_str = f'"{val}"'
-            elif isinstance(val, bool):
-                # 布尔值转回对应语言
-                bool_enum = BooleanType.TRUE if val else BooleanType.FALSE
-                val_str = cfg.booleans.get_primary_token(bool_enum)
-            elif isinstance(val, list):
-
-                def fmt_item(x: Any) -> str:
-                    if isinstance(x, datetime):
-                        return x.strftime("%Y-%m-%d %H:%M:%S")
-                    return f'"{x}"' if isinstance(x, str) else str(x)
-
-                # 递归处理列表内元素
-                items = [fmt_item(x) for x in val]
-                # 使用主要的括号符号
-                lb = cfg.punctuation.get_primary_token(PunctuationType.LBRACK)
-                rb = cfg.punctuation.get_primary_token(PunctuationType.RBRACK)
-                # 使用主要的逗号分隔符
-                sep = cfg.punctuation.get_primary_token(PunctuationType.COMMA) + " "
-                val_str = f"{lb}{sep.join(items)}{rb}"
-            else:
-                val_str = str(val)
-
-            return f"{field_str}{op_str}{val_str}"
+            out.append(self._dump_condition(node, cfg))
+            return
 
         if isinstance(node, RuleGroup):
             # 获取主要的逻辑词
-            l_enum = LogicType(node.logic)
-            logic_str = cfg.logic.get_primary_token(l_enum)
-
-            # 递归
-            children = [self.dump_rule(c, mode) for c in node.conditions]
-
-            # 拼接
-            joined = f" {logic_str} ".join(children)
+            logic_str = cfg.logic.get_primary_token(node.logic)
 
             # 如果是 NOT，加括号
-            if l_enum == LogicType.NOT:
-                return f"{logic_str} ({children[0]})"
+            if node.logic == LogicType.NOT:
+                out.append(f"{logic_str} (")
+                self._dump_node(node.conditions[0], cfg, out)
+                out.append(")")
+                return
 
             # 顶层是否加括号通常由调用方决定，这里简单处理：如果是复合组，加上括号
-            return f"({joined})"
+            sep = f" {logic_str} "
+            out.append("(")
+            for i, child in enumerate(node.conditions):
+                if i:
+                    out.append(sep)
+                # 叶子条件直接写入，省去一层递归调用
+                if isinstance(child, Condition):
+                    out.append(self._dump_condition(child, cfg))
+                else:
+                    self._dump_node(child, cfg, out)
+            out.append(")")
+            return
 
         raise ValueError(f"Unknown node type: {type(node)}")
 
+    def _dump_condition(self, node: Condition, cfg: LangConfig) -> str:
+        """
+        将单个条件序列化为规则字符串。
+
+        Args:
+            node: 待序列化的条件。
+            cfg: 当前语言配置。
+
+        Returns:
+            str: 生成的条件字符串。
+        """
+        if isinstance(node.field, FunctionCall):
+            call = node.field
+            arg_strs = []
+            comma = cfg.punctuation.get_primary_token(PunctuationType.COMMA) + " "
+            assign = cfg.punctuation.get_primary_token(PunctuationType.ASSIGN)
+
+            # 简易值序列化 helper (复用下方 value 逻辑的部分简化版)
+            def dump_v(v: Any) -> str:
+                if isinstance(v, FunctionCall):
+                    inner_args: list[str] = []
+                    inner_args.extend([dump_v(a) for a in v.args])
+                    for k, val in v.kwargs.items():
+                        inner_args.append(f"{k}{assign}{dump_v(val)}")
+                    inner_params = comma.join(inner_args)
+                    lpar = cfg.punctuation.get_primary_token(PunctuationType.LPAR)
+                    rpar = cfg.punctuation.get_primary_token(PunctuationType.RPAR)
+                    return f"{v.name}{lpar}{inner_params}{rpar}"
+                if isinstance(v, str):
+                    return f'"{v}"'
+                if isinstance(v, bool):
+                    return "true" if v else "false"
+                return str(v)
+
+            arg_strs.extend([dump_v(a) for a in call.args])
+            for k, v in call.kwargs.items():
+                arg_strs.append(f"{k}{assign}{dump_v(v)}")
+
+            params_str = comma.join(arg_strs)
+            lpar = cfg.punctuation.get_primary_token(PunctuationType.LPAR)
+            rpar = cfg.punctuation.get_primary_token(PunctuationType.RPAR)
+            field_str = f"{call.name}{lpar}{params_str}{rpar}"
+
+        else:
+            # StrEnum 与其值哈希一致，str 字段可直接查找 Token 而无需先转回 Enum
+            # 如果是预定义的字段，用主Token，否则原样返回
+            field_tokens = cfg.fields.get_tokens(node.field)
+            field_str = field_tokens[0] if field_tokens else str(node.field)
+
+        # Op 必须是规范的
+        op_str = cfg.operators.get_primary_token(node.operator)
+
+        val = node.value
+
+        if isinstance(val, datetime):
+            # 格式：2023-01-01 12:00:00
+            val_str = val.strftime("%Y-%m-%d %H:%M:%S")
+            # 如果是整天，去掉时间部分让看起来更干净
+            if val.hour == 0 and val.minute == 0 and val.second == 0:
+                val_str = val.strftime("%Y-%m-%d")
+        elif isinstance(val, str):
+            # CNL 模式下也可以根据喜好改用中文引号，这里默认使用双引号以保持 JSON 兼容性
+            val_str = f'"{val}"'
+        elif isinstance(val, bool):
+            # 布尔值转回对应语言
+            bool_enum = BooleanType.TRUE if val else BooleanType.FALSE
+            val_str = cfg.booleans.get_primary_token(bool_enum)
+        elif isinstance(val, list):
+
+            def fmt_item(x: Any) -> str:
+                if isinstance(x, datetime):
+                    return x.strftime("%Y-%m-%d %H:%M:%S")
+                return f'"{x}"' if isinstance(x, str) else str(x)
+
+            # 递归处理列表内元素
+            items = [fmt_item(x) for x in val]
+            # 使用主要的括号符号
+            lb = cfg.punctuation.get_primary_token(PunctuationType.LBRACK)
+            rb = cfg.punctuation.get_primary_token(PunctuationType.RBRACK)
+            # 使用主要的逗号分隔符
+            sep = cfg.punctuation.get_primary_token(PunctuationType.COMMA) + " "
+            val_str = f"{lb}{sep.join(items)}{rb}"
+        else:
+            val_str = str(val)
+
+        return f"{field_str}{op_str}{val_str}"
+
     def dump_actions(self, actions: Actions, mode: Literal["dsl", "cnl"] = "dsl") -> str:
         """
         将 Actions 对象序列化为动作字符串。
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from asyncio import Lock
+import base64
+from asyncio import Lock, gather
+from functools import cache
 from typing import TYPE_CHECKING, Any, Literal, cast
 
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
-    from playwright.async_api import Browser, BrowserContext, Playwright, Route
+    from playwright.async_api import Browser, BrowserContext, Page, Playwright, Route
 
     from .config import RenderConfig
 
@@ -30,9 +32,33 @@ QUALITY_MAP_OUTPUT: dict[str, dict[str, Any]] = {
 
 VALID_BROWSER_ENGINES = Literal["chromium", "firefox", "webkit"]
 
+# 模板引用外部资源时直接中止的请求类型，避免外部 DNS/TCP 连接拖慢渲染
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+# 每个渲染质量保留的空闲页面数量上限，超出的页面在渲染结束后直接关闭
+MAX_IDLE_PAGES = 4
+
+# Chromium 启动参数，静态HTML截图无需GPU，且容器内/dev/shm通常过小
+CHROMIUM_LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+]
+
 
 class PlaywrightCore:
-    def __init__(self, browser_engine: VALID_BROWSER_ENGINES | None = None) -> None:
+    """
+    Playwright 渲染核心，管理浏览器实例、上下文与页面池
+
+    Args:
+        browser_engine: 浏览器引擎，默认为 chromium
+        browser_count: 浏览器进程数量，大于 1 时并发渲染会轮流分配到各浏览器进程
+    """
+
+    def __init__(self, browser_engine: VALID_BROWSER_ENGINES | None = None, browser_count: int = 1) -> None:
+        if browser_count < 1:
+            raise ValueError(f"browser_count must be at least 1, got {browser_count}")
         if not self.check_installed():
             raise ImportError(
                 "playwright is not installed. Please install it with 'pip install tiebameow[renderer]'.\n"
@@ -42,12 +68,17 @@ class PlaywrightCore:
         self.playwright: Playwright | None = None
         self.browser_engine = browser_engine or "chromium"
         self.browser: Browser | None = None
-        self.contexts: dict[str, BrowserContext] = {}
+        self.browser_count = browser_count
+        self._extra_browsers: list[Browser] = []
+        self._next_slot = 0
+        self.contexts: dict[tuple[str, int], BrowserContext] = {}
+        self._idle_pages: dict[tuple[str, int], list[Page]] = {}
         self._lock = Lock()
 
     @staticmethod
+    @cache
     def check_installed() -> bool:
-        """检查Playwright包是否已安装。"""
+        """检查Playwright包是否已安装，结果在进程内缓存。"""
         try:
             import playwright  # noqa: F401
         except ImportError:
@@ -67,10 +98,26 @@ class PlaywrightCore:
         engine = getattr(self.playwright, self.browser_engine)
         if not engine:
             raise ValueError(f"Invalid browser engine: {self.browser_engine}")
-        try:
-            self.browser = await engine.launch()
-        except AttributeError as e:
-            raise ValueError(f"Invalid browser engine: {self.browser_engine}") from e
+        launch_kwargs = {"args": CHROMIUM_LAUNCH_ARGS} if self.browser_engine == "chromium" else {}
+        # 并发启动全部浏览器，全部成功后才写入状态，避免部分失败后留下半初始化的实例
+        results = await gather(
+            *(engine.launch(**launch_kwargs) for _ in range(self.browser_count)), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            for browser in results:
+                if not isinstance(browser, BaseException):
+                    try:
+                        await browser.close()
+                    except Exception:
+                        pass
+            if isinstance(errors[0], AttributeError):
+                raise ValueError(f"Invalid browser engine: {self.browser_engine}") from errors[0]
+            raise errors[0]
+
+        browsers = cast("list[Browser]", results)
+        self.browser = browsers[0]
+        self._extra_browsers = browsers[1:]
 
     async def launch(self) -> None:
         """启动Playwright和浏览器实例。"""
@@ -80,10 +127,15 @@ class PlaywrightCore:
     async def close(self) -> None:
         """关闭所有浏览器上下文和浏览器实例。"""
         async with self._lock:
+            # 关闭上下文时会一并关闭其中的页面
+            self._idle_pages.clear()
             for context in self.contexts.values():
                 await context.close()
             self.contexts.clear()
 
+            for browser in self._extra_browsers:
+                await browser.close()
+            self._extra_browsers.clear()
             if self.browser is not None:
                 await self.browser.close()
                 self.browser = None
@@ -91,30 +143,70 @@ class PlaywrightCore:
                 await self.playwright.stop()
                 self.playwright = None
 
-    async def _get_context(self, quality: str) -> BrowserContext:
-        """获取指定渲染图片质量的浏览器上下文。"""
-        if quality in self.contexts:
-            return self.contexts[quality]
+    def _pick_slot(self) -> int:
+        """轮询选择本次渲染使用的浏览器序号。"""
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.browser_count
+        return slot
+
+    async def _get_context(self, quality: str, slot: int = 0) -> BrowserContext:
+        """获取指定浏览器上指定渲染图片质量的浏览器上下文。"""
+        key = (quality, slot)
+        if key in self.contexts:
+            return self.contexts[key]
 
         async with self._lock:
-            if quality in self.contexts:
-                return self.contexts[quality]
+            if key in self.contexts:
+                return self.contexts[key]
 
             if self.browser is None:
                 await self._launch()
 
-            browser = cast("Browser", self.browser)
+            browser = cast("Browser", self.browser) if slot == 0 else self._extra_browsers[slot - 1]
             scale = QUALITY_MAP_SCALE.get(quality, 1)
             context = await browser.new_context(device_scale_factor=scale)
-            self.contexts[quality] = context
+            # 页面级的 tiebameow.local 路由优先于此处的上下文级路由
+            await context.route("**/*", self._block_external)
+            self.contexts[key] = context
             return context
 
+    async def prepare(self, quality: str) -> int:
+        """预先选定下一次渲染使用的浏览器并创建所需的上下文与页面，可与HTML模板渲染并发执行。
+
+        Args:
+            quality: 渲染图片质量
+
+        Returns:
+            选定的浏览器序号，需传给随后的 render 以使用预热的页面
+        """
+        slot = self._pick_slot()
+        key = (quality, slot)
+        context = await self._get_context(*key)
+        idle = self._idle_pages.setdefault(key, [])
+        if not idle:
+            page = await context.new_page()
+            # new_page 期间其他并发预热可能已填满空闲池或上下文已被关闭，需再次检查后才放入池中
+            if len(idle) < MAX_IDLE_PAGES and self.contexts.get(key) is context:
+                idle.append(page)
+            else:
+                await page.close()
+        return slot
+
+    @staticmethod
+    async def _block_external(route: Route) -> None:
+        """中止未被页面路由处理的外部图片、媒体与字体请求。"""
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
     async def render(
         self,
         html: str,
         config: RenderConfig,
         element: str | None = None,
         request_handler: Callable[[Route], Awaitable[None]] | None = None,
+        slot: int | None = None,
     ) -> bytes:
         """使用Playwright渲染HTML为图片。
 
@@ -123,12 +215,15 @@ class PlaywrightCore:
             config: 渲染配置
             element: 可选的CSS选择器，指定要截图的元素；如果为None，则截图整个页面
             request_handler: 可选的请求处理函数，用于拦截和处理页面请求
+            slot: 可选的浏览器序号，通常为 prepare 的返回值；如果为None，则轮询选择
 
         Returns:
             渲染后的图片字节内容
         """
-        context = await self._get_context(config.quality)
-        page = await context.new_page()
+        key = (config.quality, self._pick_slot() if slot is None else slot)
+        context = await self._get_context(*key)
+        page = await self._acquire_page(key, context)
+        reusable = False
 
         try:
             await page.set_viewport_size({"width": config.width, "height": config.height})
@@ -136,13 +231,75 @@ class PlaywrightCore:
             if request_handler:
                 await page.route("http://tiebameow.local/**", request_handler)
 
-            await page.set_content(html)
-            await page.wait_for_load_state("networkidle")
+            # 图片资源均由 request_handler 提供，load 事件已覆盖其加载，无需额外等待网络空闲
+            await page.set_content(html, wait_until="load")
 
-            if element:
+            if self.browser_engine == "chromium":
+                screenshot = await self._capture_cdp(context, page, config.quality, element)
+            elif element:
                 screenshot = await page.locator(element).screenshot(**QUALITY_MAP_OUTPUT[config.quality])
             else:
                 screenshot = await page.screenshot(full_page=True, **QUALITY_MAP_OUTPUT[config.quality])
+
+            if request_handler:
+                await page.unroute("http://tiebameow.local/**", request_handler)
+            reusable = True
             return screenshot
         finally:
-            await page.close()
+            await self._release_page(key, context, page, reusable)
+
+    async def _acquire_page(self, key: tuple[str, int], context: BrowserContext) -> Page:
+        """从空闲页面池中取出页面，池为空时新建页面。"""
+        idle = self._idle_pages.get(key)
+        if idle:
+            return idle.pop()
+        return await context.new_page()
+
+    async def _release_page(self, key: tuple[str, int], context: BrowserContext, page: Page, reusable: bool) -> None:
+        """归还页面到空闲页面池；渲染失败、池已满或上下文已被关闭时关闭页面。"""
+        idle = self._idle_pages.setdefault(key, [])
+        if reusable and len(idle) < MAX_IDLE_PAGES and self.contexts.get(key) is context:
+            try:
+                # 释放上一次渲染的DOM与图片，避免空闲页面长期占用内存
+                await page.goto("about:blank")
+            except Exception:
+                await page.close()
+                return
+            # goto 期间其他并发渲染可能已归还页面或上下文已被关闭，需再次检查后才放回池中
+            if len(idle) < MAX_IDLE_PAGES and self.contexts.get(key) is context:
+                idle.append(page)
+                return
+        await page.close()
+
+    @staticmethod
+    async def _capture_cdp(context: BrowserContext, page: Page, quality: str, element: str | None) -> bytes:
+        """通过CDP的Page.captureScreenshot截图，跳过Playwright截图队列并启用optimizeForSpeed编码。"""
+        # page.screenshot 会自动等待字体就绪，直接使用CDP截图时需显式等待以免截到回退字体
+        await page.evaluate("() => document.fonts.ready.then(() => null)")
+        if element:
+            box = await page.locator(element).bounding_box()
+            if box is None:
+                raise ValueError(f"Element is not visible: {element}")
+            clip = {"x": box["x"], "y": box["y"], "width": box["width"], "height": box["height"]}
+        else:
+            width, height = await page.evaluate(
+                "() => [document.documentElement.scrollWidth, document.documentElement.scrollHeight]"
+            )
+            clip = {"x": 0, "y": 0, "width": width, "height": height}
+
+        output = QUALITY_MAP_OUTPUT[quality]
+        params: dict[str, Any] = {
+            "format": output["type"],
+            "clip": {**clip, "scale": 1},
+            "captureBeyondViewport": True,
+            "optimizeForSpeed": True,
+        }
+        if "quality" in output:
+            params["quality"] = output["quality"]
+
+        cdp = await context.new_cdp_session(page)
+        try:
+            result = await cdp.send("Page.captureScreenshot", params)
+        finally:
+            await cdp.detach()
+        return base64.b64decode(result["data"])
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict
 from datetime import datetime
+from functools import cache
 from typing import TYPE_CHECKING, Any, Literal
 
 import jinja2
@@ -15,10 +17,10 @@ from ..parser import convert_aiotieba_comment, convert_aiotieba_post, convert_ai
 from ..utils.logger import logger
 from .config import RenderConfig
 from .playwright_core import PlaywrightCore
-from .style import FONT_URL, font_path, get_font_style
+from .style import FONT_URL, get_font_bytes, get_font_style
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import Awaitable, Callable, Sequence
     from pathlib import Path
 
     from playwright.async_api import Route
@@ -36,6 +38,56 @@ def format_date(dt: datetime | int | float) -> str:
     return dt.strftime("%Y-%m-%d %H:%M")
 
 
+# 头像尺寸到百度头像路径后缀的映射，未知尺寸使用中等尺寸
+_PORTRAIT_PATH = {"s": "n", "m": "", "l": "h"}
+# 图片尺寸到百度图床路径的映射
+_IMAGE_PATH = {
+    "s": "w=720;q=60;g=0/sign=__",
+    "m": "w=960;q=60;g=0/sign=__",
+    "l": "pic/item",
+}
+# 头像与吧头像的 LRU 缓存容量（条目数），这两类资源体积小且在多次渲染间高度重复
+_ASSET_CACHE_SIZE = 512
+
+
+def _create_env(
+    loader: jinja2.BaseLoader,
+    auto_reload: bool = True,
+    bytecode_cache: jinja2.BytecodeCache | None = None,
+) -> jinja2.Environment:
+    env = jinja2.Environment(loader=loader, auto_reload=auto_reload, bytecode_cache=bytecode_cache)
+    env.filters["format_date"] = format_date
+    return env
+
+
+def _create_bytecode_cache() -> jinja2.BytecodeCache | None:
+    """创建位于系统临时目录的模板字节码缓存，临时目录不可用时不启用缓存。"""
+    try:
+        return jinja2.FileSystemBytecodeCache()
+    except (OSError, RuntimeError):
+        return None
+
+
+@cache
+def _get_default_env() -> jinja2.Environment:
+    """
+    获取内置模板的 Environment
+
+    在所有 Renderer 实例间共享，以复用已编译的模板缓存，并在首次使用时才创建，避免导入模块即创建临时目录。
+    内置模板随包发布不会变化，关闭 auto_reload 以免每次 get_template 都检查文件修改时间；
+    字节码缓存使新进程无需重新解析与编译内置模板。
+    """
+    return _create_env(
+        jinja2.PackageLoader("tiebameow.renderer", "templates"),
+        auto_reload=False,
+        bytecode_cache=_create_bytecode_cache(),
+    )
+
+
+# 渲染入口直接使用的内置模板，在 Renderer 启动时预编译
+_ENTRY_TEMPLATES = ("thread.html", "thread_info.html", "thread_detail.html", "text.html", "text_simple.html")
+
+
 class Renderer:
     """
     渲染器，用于将贴子数据渲染为图像
@@ -44,6 +96,7 @@ class Renderer:
         client: 用于获取资源的客户端实例，若为 None 则创建新的 Client 实例
         config: 渲染配置，若为 None 则使用默认配置
         template_dir: 自定义模板目录，若为 None 则使用内置模板
+        browser_count: 浏览器进程数量，并发渲染较多时可适当调大
     """
 
     def __init__(
@@ -51,8 +104,9 @@ class Renderer:
         client: Client | None = None,
         config: RenderConfig | None = None,
         template_dir: str | Path | None = None,
+        browser_count: int = 1,
     ) -> None:
-        self.core = PlaywrightCore()
+        self.core = PlaywrightCore(browser_count=browser_count)
 
         if config is None:
             config = RenderConfig()
@@ -62,14 +116,16 @@ class Renderer:
         self._own_client = client is None
         self._client_entered = False
 
-        loader: jinja2.BaseLoader
+        self._builtin_templates = not template_dir
         if template_dir:
-            loader = jinja2.FileSystemLoader(str(template_dir))
+            self.env = _create_env(jinja2.FileSystemLoader(str(template_dir)))
         else:
-            loader = jinja2.PackageLoader("tiebameow.renderer", "templates")
+            self.env = _get_default_env()
+        # 已解析的模板对象，仅在关闭 auto_reload 时缓存，以跳过 Environment 的加锁 LRU 查找
+        self._templates: dict[str, jinja2.Template] = {}
 
-        self.env = jinja2.Environment(loader=loader, enable_async=True)
-        self.env.filters["format_date"] = format_date
+        self._asset_cache: OrderedDict[str, bytes] = OrderedDict()
+        self._asset_pending: dict[str, asyncio.Future[bytes]] = {}
 
     async def close(self) -> None:
         await self.core.close()
@@ -83,6 +139,9 @@ class Renderer:
             self._client_entered = True
 
     async def __aenter__(self) -> Renderer:
+        if self._builtin_templates:
+            for name in _ENTRY_TEMPLATES:
+                self._get_template(name)
         await self._ensure_client()
         try:
             await self.core.launch()
@@ -96,6 +155,12 @@ class Renderer:
     ) -> None:
         await self.close()
 
+    def _resolve_config(self, overrides: dict[str, Any]) -> RenderConfig:
+        """合并默认配置与单次渲染的覆盖参数，无覆盖时直接复用默认配置"""
+        if not overrides:
+            return self.config
+        return RenderConfig.model_construct(**{**self.config.__dict__, **overrides})
+
     @staticmethod
     def _get_portrait_url(portrait: str, size: Literal["s", "m", "l"] = "s") -> str:
         """获取用户头像的本地URL"""
@@ -135,8 +200,8 @@ class Renderer:
             return
 
         if str(url) == FONT_URL:
-            if font_path.exists():
-                await route.fulfill(path=font_path)
+            if (font_bytes := get_font_bytes()) is not None:
+                await route.fulfill(body=font_bytes, content_type="font/woff2")
             else:
                 await route.abort()
             return
@@ -149,16 +214,10 @@ class Renderer:
                     await route.abort()
                     return
 
-                path = ""
-                if size == "s":
-                    path = "n"
-                elif size == "l":
-                    path = "h"
-
-                real_url = yarl.URL.build(
-                    scheme="http", host="tb.himg.baidu.com", path=f"/sys/portrait{path}/item/{portrait}"
+                path = _PORTRAIT_PATH.get(size, "")
+                await self._proxy_request(
+                    route, f"http://tb.himg.baidu.com/sys/portrait{path}/item/{portrait}", cache=True
                 )
-                await self._proxy_request(route, str(real_url))
 
             elif url.path == "/image":
                 image_hash = url.query.get("hash")
@@ -168,27 +227,12 @@ class Renderer:
                     await route.abort()
                     return
 
-                if size == "s":
-                    real_url = yarl.URL.build(
-                        scheme="http",
-                        host="imgsrc.baidu.com",
-                        path=f"/forum/w=720;q=60;g=0/sign=__/{image_hash}.jpg",
-                    )
-                elif size == "m":
-                    real_url = yarl.URL.build(
-                        scheme="http",
-                        host="imgsrc.baidu.com",
-                        path=f"/forum/w=960;q=60;g=0/sign=__/{image_hash}.jpg",
-                    )
-                elif size == "l":
-                    real_url = yarl.URL.build(
-                        scheme="http", host="imgsrc.baidu.com", path=f"/forum/pic/item/{image_hash}.jpg"
-                    )
-                else:
+                image_path = _IMAGE_PATH.get(size)
+                if image_path is None:
                     await route.abort()
                     return
 
-                await self._proxy_request(route, str(real_url))
+                await self._proxy_request(route, f"http://imgsrc.baidu.com/forum/{image_path}/{image_hash}.jpg")
 
             elif url.path == "/forum":
                 fname = url.query.get("fname")
@@ -197,11 +241,8 @@ class Renderer:
                     return
 
                 try:
-                    forum_info = await self.client.get_forum(fname)
-                    if forum_info and forum_info.small_avatar:
-                        await self._proxy_request(route, forum_info.small_avatar)
-                    else:
-                        await route.abort()
+                    data = await self._fetch_cached(f"forum:{fname}", lambda: self._fetch_forum_icon(fname))
+                    await route.fulfill(body=data)
                 except Exception:
                     await route.abort()
 
@@ -212,15 +253,73 @@ class Renderer:
             logger.error(f"Error handling route {url}: {e}")
             await route.abort()
 
-    async def _proxy_request(self, route: Route, url: str) -> None:
+    async def _proxy_request(self, route: Route, url: str, cache: bool = False) -> None:
         try:
-            response = await self.client.get_image_bytes(url)
-            await route.fulfill(body=response.data)
+            data = await self._fetch_cached(url, lambda: self._fetch_image_bytes(url), store=cache)
+            await route.fulfill(body=data)
         except Exception as e:
             logger.error(f"Failed to proxy request for {url}: {e}")
             await route.abort()
 
-    async def _build_content_context(
+    async def _fetch_image_bytes(self, url: str) -> bytes:
+        response = await self.client.get_image_bytes(url)
+        data: bytes = response.data
+        # aiotieba 在请求失败时返回空字节而非抛出异常，需显式视为失败以免被缓存
+        if not data:
+            raise ValueError(f"Empty image response: {url}")
+        return data
+
+    async def _fetch_forum_icon(self, fname: str) -> bytes:
+        forum_info = await self.client.get_forum(fname)
+        if not forum_info or not forum_info.small_avatar:
+            raise ValueError(f"Forum {fname} has no icon")
+        return await self._fetch_image_bytes(forum_info.small_avatar)
+
+    async def _fetch_cached(self, key: str, fetch: Callable[[], Awaitable[bytes]], store: bool = True) -> bytes:
+        """
+        带 LRU 缓存的资源获取
+
+        命中缓存时直接返回；同一资源的并发请求共享一次获取，失败结果不会被缓存。
+
+        Args:
+            key: 缓存键
+            fetch: 缓存未命中时用于获取资源字节的协程函数
+            store: 是否将结果写入 LRU 缓存，为 False 时仅合并并发请求
+
+        Returns:
+            资源字节内容
+        """
+        if (data := self._asset_cache.get(key)) is not None:
+            self._asset_cache.move_to_end(key)
+            return data
+
+        if (pending := self._asset_pending.get(key)) is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+        self._asset_pending[key] = future
+        try:
+            data = await fetch()
+            future.set_result(data)
+        except Exception as e:
+            future.set_exception(e)
+            # 标记异常已被取回，避免没有并发等待者时产生告警
+            future.exception()
+            raise
+        finally:
+            del self._asset_pending[key]
+            if not future.done():
+                # 发起者被取消时以普通异常结束共享结果，CancelledError 不会被等待者的 except Exception 捕获
+                future.set_exception(RuntimeError(f"Fetch for {key} was cancelled"))
+                future.exception()
+
+        if store:
+            self._asset_cache[key] = data
+            if len(self._asset_cache) > _ASSET_CACHE_SIZE:
+                self._asset_cache.popitem(last=False)
+        return data
+
+    def _build_content_context(
         self,
         content: ThreadDTO | ThreadpDTO | PostDTO | CommentDTO,
         max_image_count: int = 9,
@@ -229,6 +328,9 @@ class Renderer:
         """
         构建渲染内容上下文字典
 
+        仅生成指向 tiebameow.local 的虚拟资源地址，实际的头像、图片请求由浏览器并发发起并经
+        _handle_route 代理，因此此处为纯同步计算。
+
         Args:
             content: 要构建上下文的内容，可以是 ThreadDTO、PostDTO 或 CommentDTO
             max_image_count: 最大包含的图片数量，默认为 9
@@ -264,7 +366,7 @@ class Renderer:
             context["floor"] = content.floor
             if show_link:
                 context["sub_text_list"].append(f"pid: {content.pid}")
-            context["comments"] = [await self._build_content_context(c, max_image_count) for c in content.comments]
+            context["comments"] = [self._build_content_context(c, max_image_count) for c in content.comments]
         elif isinstance(content, CommentDTO):
             context["pid"] = content.cid
             context["floor"] = content.floor
@@ -275,17 +377,28 @@ class Renderer:
             size: Literal["s", "m", "l"] = "s" if isinstance(content, CommentDTO) else "m"
             context["portrait_url"] = self._get_portrait_url(content.author.portrait, size=size)
 
-        if context["image_hash_list"]:
-            limit = min(max_image_count, len(context["image_hash_list"]))
-            context["image_url_list"] = [self._get_image_url(h, size="s") for h in context["image_hash_list"][:limit]]
-            context["remain_image_count"] = max(0, len(context["image_hash_list"]) - limit)
+        image_hash_list = context["image_hash_list"]
+        if image_hash_list:
+            context["image_url_list"] = [self._get_image_url(h, size="s") for h in image_hash_list[:max_image_count]]
+            context["remain_image_count"] = max(0, len(image_hash_list) - max_image_count)
 
         return context
 
-    async def _render_html(self, template_name: str, data: dict[str, Any]) -> str:
+    def _get_template(self, template_name: str) -> jinja2.Template:
+        """获取模板对象，模板不会热重载时复用已解析的模板"""
+        if (template := self._templates.get(template_name)) is not None:
+            return template
+        template = self.env.get_template(template_name)
+        if not self.env.auto_reload:
+            self._templates[template_name] = template
+        return template
+
+    def _render_html(self, template_name: str, data: dict[str, Any]) -> str:
         """
         使用指定模板渲染 HTML
 
+        模板不包含任何异步操作，因此使用同步渲染以省去 Jinja 异步模式的协程开销。
+
         Args:
             template_name: 模板名称
             data: 渲染数据字典
@@ -293,8 +406,8 @@ class Renderer:
         Returns:
             str: 渲染后的 HTML 字符串
         """
-        template = self.env.get_template(template_name)
-        html = await template.render_async(**data)
+        template = self._get_template(template_name)
+        html = template.render(**data)
         return html
 
     async def _render_image(
@@ -316,9 +429,22 @@ class Renderer:
         Returns:
             bytes: 渲染后的图像字节数据
         """
-        html = await self._render_html(template_name, data or {})
+        config = config or self.config
+        # 浏览器预热先行运行至首个 I/O 等待，冷启动时模板渲染可与其重叠
+        prepare_task = asyncio.create_task(self.core.prepare(config.quality))
+        await asyncio.sleep(0)
+        try:
+            html = self._render_html(template_name, data or {})
+        except BaseException:
+            # 模板错误优先于浏览器预热错误抛出
+            try:
+                await prepare_task
+            except Exception:
+                pass
+            raise
+        slot = await prepare_task
         image_bytes = await self.core.render(
-            html, config or self.config, element=element, request_handler=self._handle_route
+            html, config, element=element, request_handler=self._handle_route, slot=slot
         )
         return image_bytes
 
@@ -348,7 +474,7 @@ class Renderer:
         """
         await self._ensure_client()
 
-        render_config = self.config.model_copy(update=config)
+        render_config = self._resolve_config(config)
 
         if isinstance(content, Thread):
             content = convert_aiotieba_thread(content)
@@ -359,7 +485,7 @@ class Renderer:
         elif isinstance(content, Comment | Comment_p):
             content = convert_aiotieba_comment(content)
 
-        content_context = await self._build_content_context(content, max_image_count)
+        content_context = self._build_content_context(content, max_image_count)
 
         if title and isinstance(content, ThreadDTO):
             content_context["title"] = title
@@ -416,31 +542,25 @@ class Renderer:
             生成的图像的字节数据
         """
         await self._ensure_client()
-        render_config = self.config.model_copy(update=config)
+        render_config = self._resolve_config(config)
 
         if isinstance(thread, Thread):
             thread = convert_aiotieba_thread(thread)
         elif isinstance(thread, Thread_p):
             thread = convert_aiotieba_threadp(thread)
 
-        posts_dtos: list[PostDTO] = []
-        if posts:
-            for p in posts:
-                if isinstance(p, Post):
-                    posts_dtos.append(convert_aiotieba_post(p))
-                else:
-                    posts_dtos.append(p)
-
-        if ignore_first_floor:
-            posts_dtos = [p for p in posts_dtos if p.floor != 1]
+        thread_context = self._build_content_context(thread, max_image_count, show_link=show_link)
 
-        thread_context = await self._build_content_context(thread, max_image_count, show_link=show_link)
-        posts_contexts = await asyncio.gather(*[
-            self._build_content_context(p, max_image_count, show_link=show_link) for p in posts_dtos
-        ])
+        # 转换、过滤与构建上下文在一次遍历中完成
+        posts_contexts: list[dict[str, Any]] = []
+        for p in posts or ():
+            if ignore_first_floor and p.floor == 1:
+                continue
+            post_dto = convert_aiotieba_post(p) if isinstance(p, Post) else p
+            posts_contexts.append(self._build_content_context(post_dto, max_image_count, show_link=show_link))
 
         if show_thread_info:
-            info_html = await self._render_html(
+            info_html = self._render_html(
                 "thread_info.html",
                 {
                     "share_num": thread.share_num,
@@ -491,7 +611,7 @@ class Renderer:
         Returns:
             生成的图像的字节数据
         """
-        render_config = self.config.model_copy(update=config)
+        render_config = self._resolve_config(config)
 
         template_name = "text_simple.html" if simple_mode else "text.html"
 
@@ -1,11 +1,21 @@
+from functools import cache
 from pathlib import Path
 
-__all__ = ["get_font_style", "font_path", "FONT_URL"]
+__all__ = ["get_font_style", "get_font_bytes", "font_path", "FONT_URL"]
 
 font_path = Path(__file__).parent / "static" / "fonts" / "NotoSansSC-Regular.woff2"
 FONT_URL = "http://tiebameow.local/fonts/NotoSansSC-Regular.woff2"
 
 
+@cache
+def get_font_bytes() -> bytes | None:
+    """读取内置字体文件，结果在进程内缓存以免每个页面重复读取约4MB的文件。"""
+    if not font_path.exists():
+        return None
+    return font_path.read_bytes()
+
+
+@cache
 def get_font_style(font_size: int = 14) -> str:
     if not font_path.exists():
         return f"""<style>
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from enum import StrEnum, unique
-from typing import Any, Self
+from typing import Annotated, Any, Self
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Discriminator, Field, Tag, model_validator
 
 
 @unique
@@ -149,8 +149,18 @@ class RuleGroup(BaseModel):
     conditions: list[RuleNode]
 
 
-# 递归类型别名
-type RuleNode = Condition | RuleGroup
+def _rule_node_tag(value: Any) -> str:
+    """根据是否携带 logic 字段区分规则组与条件，供 pydantic 直接分派到对应模型。"""
+    if isinstance(value, dict):
+        return "group" if "logic" in value else "condition"
+    return "group" if isinstance(value, RuleGroup) else "condition"
+
+
+# 递归类型别名，通过判别器一次分派，避免依次尝试联合类型的各个成员
+type RuleNode = Annotated[
+    Annotated[Condition, Tag("condition")] | Annotated[RuleGroup, Tag("group")],
+    Discriminator(_rule_node_tag),
+]
 
 
 class DeleteAction(BaseModel):
@@ -187,6 +197,46 @@ class Actions(BaseModel):
     notify: NotifyAction = Field(default_factory=NotifyAction)
 
 
+def _collect_fields(node: RuleNode) -> dict[FieldType, None]:
+    """按深度优先顺序收集规则树中引用的全部标准字段，函数调用字段不计入。"""
+    fields: dict[FieldType, None] = {}
+    stack: list[RuleNode] = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, RuleGroup):
+            stack.extend(reversed(current.conditions))
+        elif isinstance(current.field, FieldType):
+            fields[current.field] = None
+    return fields
+
+
+# 仅 Thread 可用的字段
+_THREAD_ONLY_FIELDS = frozenset({
+    FieldType.TITLE,
+    FieldType.IS_GOOD,
+    FieldType.IS_TOP,
+    FieldType.IS_SHARE,
+    FieldType.IS_HIDE,
+    FieldType.VIEW_NUM,
+    FieldType.SHARE_NUM,
+    FieldType.LAST_TIME,
+    FieldType.SHARE_FNAME,
+    FieldType.SHARE_FID,
+    FieldType.SHARE_TITLE,
+    FieldType.SHARE_TEXT,
+})
+
+# 仅 Thread/Post 可用的字段
+_THREAD_POST_FIELDS = frozenset({FieldType.REPLY_NUM})
+
+# 各目标类型下禁止使用的字段
+_FORBIDDEN_FIELDS: dict[TargetType, frozenset[FieldType]] = {
+    TargetType.POST: _THREAD_ONLY_FIELDS,
+    TargetType.COMMENT: _THREAD_ONLY_FIELDS | _THREAD_POST_FIELDS,
+    TargetType.ALL: _THREAD_ONLY_FIELDS | _THREAD_POST_FIELDS,
+}
+
+
 class ReviewRule(BaseModel):
     """完整的审查规则实体。
 
@@ -221,45 +271,13 @@ class ReviewRule(BaseModel):
     @model_validator(mode="after")
     def validate_trigger_match_target(self) -> Self:
         """验证 trigger 中的字段是否匹配 target_type。"""
-
-        thread_only_fields = {
-            FieldType.TITLE,
-            FieldType.IS_GOOD,
-            FieldType.IS_TOP,
-            FieldType.IS_SHARE,
-            FieldType.IS_HIDE,
-            FieldType.VIEW_NUM,
-            FieldType.SHARE_NUM,
-            FieldType.LAST_TIME,
-            FieldType.SHARE_FNAME,
-            FieldType.SHARE_FID,
-            FieldType.SHARE_TITLE,
-            FieldType.SHARE_TEXT,
-        }
-
-        thread_post_fields = {FieldType.REPLY_NUM}
-
-        target = self.target_type
-
-        forbidden_fields: set[FieldType] = set()
-
-        if target == TargetType.POST:
-            forbidden_fields = thread_only_fields
-        elif target == TargetType.COMMENT:
-            forbidden_fields = thread_only_fields | thread_post_fields
-        elif target == TargetType.ALL:
-            forbidden_fields = thread_only_fields | thread_post_fields
-
+        forbidden_fields = _FORBIDDEN_FIELDS.get(self.target_type)
         if not forbidden_fields:
             return self
 
-        def validate_node(node: RuleNode) -> None:
-            if isinstance(node, Condition):
-                if node.field in forbidden_fields:
-                    raise ValueError(f"Field '{node.field}' is not valid for target_type '{target}'")
-            elif isinstance(node, RuleGroup):
-                for child in node.conditions:
-                    validate_node(child)
-
-        validate_node(self.trigger)
+        # 按出现顺序收集字段，先以集合运算整体判断，仅在存在非法字段时定位首个用于报错
+        fields = _collect_fields(self.trigger)
+        if not forbidden_fields.isdisjoint(fields):
+            invalid = next(f for f in fields if f in forbidden_fields)
+            raise ValueError(f"Field '{invalid}' is not valid for target_type '{self.target_type}'")
         return self
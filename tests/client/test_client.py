@@ -197,3 +197,29 @@ async def test_cooldown_until_never_decreases_under_concurrency() -> None:
 
         await asyncio.gather(client._update_cooldown_until(), client._update_cooldown_until())
         assert client._cooldown_until >= initial
+
+
+@pytest.mark.asyncio
+async def test_get_image_bytes_bounded_concurrency() -> None:
+    active = 0
+    peak = 0
+
+    async def _fake_get_image_bytes(self: Client, img_url: str) -> str:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return img_url
+
+    async with Client(max_image_concurrency=2) as client:
+        with patch("tiebameow.client.tieba_client.tb.Client.get_image_bytes", _fake_get_image_bytes):
+            res = await asyncio.gather(*(client.get_image_bytes(f"http://img/{i}") for i in range(6)))
+
+    assert res == [f"http://img/{i}" for i in range(6)]
+    assert peak == 2
+
+
+def test_client_rejects_invalid_image_concurrency() -> None:
+    with pytest.raises(ValueError, match="max_image_concurrency"):
+        Client(max_image_concurrency=0)
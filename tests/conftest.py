@@ -3,6 +3,8 @@ from typing import Any
 
 import pytest
 
+from tiebameow.parser.rule_parser import RuleEngineParser
+
 
 # Mock aiotieba fragment classes as dataclasses because parser uses dataclasses.asdict
 # Naming them to match aiotieba classes so parser can map them correctly
@@ -64,6 +66,12 @@ class MockThread:
             setattr(self, k, v)
 
 
+@pytest.fixture(scope="session")
+def parser() -> RuleEngineParser:
+    # 解析器只读使用，整个测试会话共享一个实例以免重复构建语法
+    return RuleEngineParser()
+
+
 @pytest.fixture
 def mock_aiotieba_fragments() -> dict[str, Any]:
     return {
@@ -68,6 +68,10 @@ def test_base_user_dto() -> None:
     user_no_nick = BaseUserDTO(user_id=1, portrait="portrait", user_name="user_name", nick_name_new="")
     assert user_no_nick.nick_name == ""
     assert user_no_nick.show_name == "user_name"
+    # show_name 随昵称变化实时计算
+    assert user_no_nick.model_copy(update={"nick_name_new": "N"}).show_name == "N"
+    user_no_nick.nick_name_new = "Z"
+    assert user_no_nick.show_name == "Z"
 
 
 def test_thread_user_dto() -> None:
@@ -216,6 +220,25 @@ def test_base_dto_with_plain_pydantic_model() -> None:
     assert obj.inner.y == 0
 
 
+def test_base_dto_zero_value_override() -> None:
+    """Test subclass overrides of _get_zero_value are used for model fields."""
+
+    class OverrideDTO(BaseDTO):
+        inner: PlainModel
+
+        @classmethod
+        def _get_zero_value(cls, field_type):
+            if field_type is PlainModel:
+                return PlainModel(x=42, y=0)
+            return super()._get_zero_value(field_type)
+
+    first = OverrideDTO.from_incomplete_data({})
+    second = OverrideDTO.from_incomplete_data({})
+    assert first.inner.x == 42
+    assert second.inner == first.inner
+    assert second.inner is not first.inner
+
+
 def test_dto_list_none_handling() -> None:
     # Test that None passed to a list field becomes []
     class ListDTO(BaseDTO):
@@ -358,3 +381,31 @@ def test_zero_value_union_types():
     assert dto.opt_int is None
     assert dto.opt_str is None
     assert dto.create_time == datetime.fromtimestamp(0)
+
+
+def test_base_dto_zero_factories_cached() -> None:
+    """零值工厂按类缓存，且可变零值每次补全都是新对象。"""
+    first = SimpleDTO.from_incomplete_data({})
+    factories = SimpleDTO._zero_factories()
+    assert SimpleDTO._zero_factories() is factories
+
+    second = SimpleDTO.from_incomplete_data({})
+    assert first.tags == second.tags == []
+    assert first.tags is not second.tags
+    assert first.metadata is not second.metadata
+
+    first_wrapper = WrapperDTO.from_incomplete_data({})
+    second_wrapper = WrapperDTO.from_incomplete_data({})
+    assert first_wrapper.inner == PlainModel(x=0, y=0)
+    assert first_wrapper.inner is not second_wrapper.inner
+
+
+def test_base_dto_from_incomplete_list() -> None:
+    items = [{"name": "a", "age": 1}, None, SimpleDTO.from_incomplete_data({"name": "c"})]
+    result = SimpleDTO.from_incomplete_list(items)
+    assert result == [SimpleDTO.from_incomplete_data(item) for item in items]
+    assert result[1].tags is not result[2].tags
+
+    wrappers = WrapperDTO.from_incomplete_list([{"inner": {"x": 1}}])
+    assert wrappers[0].inner == PlainModel(x=1, y=0)
+    assert SimpleDTO.from_incomplete_list([]) == []
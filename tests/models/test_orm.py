@@ -1,6 +1,6 @@
 from collections.abc import Iterator
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, cast
 from unittest.mock import Mock
 
 import pytest
@@ -220,6 +220,21 @@ def test_fragment_list_type_validate_fallback():
     assert res.text == "fallback"
 
 
+def test_fragment_list_type_result_mixed_legacy():
+    def fallback_func():
+        return FragTextModel(text="fallback")
+
+    type_impl = FragmentListType(fallback=fallback_func)
+    dialect = Mock()
+    # 整个列表校验失败时退回逐项处理，旧版类型标识与无法识别的片段仍能还原
+    res = type_impl.process_result_value(
+        [{"type": "text", "text": "a"}, {"type": "FragText", "text": "b"}, {"type": "bogus"}], dialect
+    )
+    assert res is not None
+    assert all(isinstance(frag, FragTextModel) for frag in res)
+    assert [cast("FragTextModel", frag).text for frag in res] == ["a", "b", "fallback"]
+
+
 def test_fragment_list_type_validate_raise():
     type_impl = FragmentListType()
     invalid_item = {"type": "unknown_invalid_type", "garbage": 1}
@@ -353,6 +368,18 @@ class TestORMMethods:
         assert out_data.fid == 10
         assert out_data.name == "test"
         assert out_data.trigger == trigger
+        assert out_data.actions is act
+        assert out_data == rule_data
+
+        # 库中的非法规则在转换时被拒绝
+        orm_obj.priority = 99
+        with pytest.raises(ValidationError):
+            orm_obj.to_rule_data()
+        orm_obj.priority = 1
+        orm_obj.target_type = TargetType.COMMENT
+        orm_obj.trigger = Condition(field=FieldType.TITLE, operator=OperatorType.EQ, value="x")
+        with pytest.raises(ValidationError, match="not valid for target_type"):
+            orm_obj.to_rule_data()
 
 
 # --- RuleNodeType Specialized Tests ---
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import pytest
+
+from tiebameow.parser.fast_dsl import parse_dsl
+from tiebameow.parser.rule_parser import DSL_CONFIG, RuleEngineParser
+
+
+def _parse_with_grammar(parser: RuleEngineParser, text: str):
+    res = parser._parsers["dsl"][0].parse_string(text, parse_all=True)[0]
+    return parser._to_rule_node(res, DSL_CONFIG)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "title contains 'hello'",
+        "Author.Level>=5",
+        'text CONTAINS "广告"',
+        "agree_num == -3",
+        "agree_num > 1.",
+        "agree_num < 2E-2",
+        "is_good == True",
+        "is_good == TRUE",
+        "is_top != false",
+        "  reply_num>=10  ",
+        "author.user_id in ['1', 2, false]",
+        "text in [5]",
+        "text contains '' and title contains 'x'",
+        "(title contains 'A' AND title contains 'B') OR NOT title contains 'C'",
+        "title contains 'a' OR title contains 'b' AND NOT NOT is_top == false OR reply_num < 1",
+        "(title contains 'a') AND (title contains 'b') AND author.level > 1",
+        "((title contains 'a' AND title contains 'b')) AND author.level > 1",
+        "  NOT(title contains 'a')\n",
+    ],
+)
+def test_parse_dsl_matches_grammar(parser: RuleEngineParser, text: str):
+    node = parse_dsl(text, DSL_CONFIG)
+    assert node is not None
+    # repr 同时比较数值类型 (int/float/bool)
+    assert repr(node) == repr(_parse_with_grammar(parser, text))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "create_time > 1d",
+        "create_time < NOW",
+        "create_time > '2023-01-01'",
+        "text contains 'a\\'b'",
+        "ocr(img) contains 'a'",
+        "textcontains 'a'",
+        "unknown_field == 1",
+        "ocr > 1",
+        "text in [[1], 2]",
+        "text in []",
+        "title contains 'a' AND",
+        "title contains 'a' title contains 'b'",
+        "标题包含'a'",
+        "text in [1，2]",
+    ],
+)
+def test_parse_dsl_falls_back(text: str):
+    assert parse_dsl(text, DSL_CONFIG) is None
+
+
+def test_parse_rule_uses_fast_parser(parser: RuleEngineParser, monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(parser._parsers["dsl"][0], "parse_string", lambda *a, **k: calls.append("grammar"))
+    parser._rule_cache.clear()
+    parser.parse_rule("title contains 'a' AND author.level > 1")
+    assert calls == []
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-import math
 from datetime import datetime, timedelta
+from typing import Any, Literal
 from unittest.mock import patch
 
 import pyparsing as pp
@@ -21,11 +21,6 @@ from tiebameow.schemas.rules import (
 from tiebameow.utils.time_utils import SHANGHAI_TZ
 
 
-@pytest.fixture
-def parser():
-    return RuleEngineParser()
-
-
 @pytest.fixture
 def fixed_now() -> datetime:
     return datetime(2023, 10, 1, 12, 0, 0, tzinfo=SHANGHAI_TZ)
@@ -37,6 +32,19 @@ def mock_now(monkeypatch, fixed_now):
     monkeypatch.setattr("tiebameow.parser.rule_parser.now_with_tz", lambda: fixed_now)
 
 
+def test_parser_grammar_shared_across_instances(parser: RuleEngineParser):
+    other = RuleEngineParser()
+    assert other._parsers is parser._parsers
+
+    class CustomParser(RuleEngineParser):
+        pass
+
+    # 子类可能覆盖语法构建方法，因此单独构建
+    custom = CustomParser()
+    assert custom._parsers is not parser._parsers
+    assert custom.parse_rule("title contains 'a'") == parser.parse_rule("title contains 'a'")
+
+
 class TestRuleEngineParserBasic:
     # === 1. Basic Parsing Tests (DSL & CNL) ===
 
@@ -56,32 +64,76 @@ class TestRuleEngineParserBasic:
         assert node.operator == OperatorType.CONTAINS
         assert node.value == "你好"
 
-    def test_parse_cnl_synonyms(self, parser: RuleEngineParser):
-        cases = [
-            ("加精等于真", FieldType.IS_GOOD),
-            ("精华帖等于真", FieldType.IS_GOOD),
-            ("精华贴等于真", FieldType.IS_GOOD),
-        ]
-        for rule_text, field_enum in cases:
-            node = parser.parse_rule(rule_text, mode="cnl")
-            assert isinstance(node, Condition)
-            assert node.field == field_enum
-            assert node.value is True
-
-    def test_parse_operators(self, parser: RuleEngineParser):
-        cases = [
+    @pytest.mark.parametrize("rule_text", ["加精等于真", "精华帖等于真", "精华贴等于真"])
+    def test_parse_cnl_synonyms(self, parser: RuleEngineParser, rule_text: str):
+        node = parser.parse_rule(rule_text, mode="cnl")
+        assert isinstance(node, Condition)
+        assert node.field == FieldType.IS_GOOD
+        assert node.value is True
+
+    @pytest.mark.parametrize(
+        ("text", "mode", "op_enum", "val"),
+        [
             ("author.level > 5", "dsl", OperatorType.GT, 5),
             ("等级大于5", "cnl", OperatorType.GT, 5),
             ("reply_num >= 10", "dsl", OperatorType.GTE, 10),
             ("回复数大于等于10", "cnl", OperatorType.GTE, 10),
             ("author.user_id in ['1', '2']", "dsl", OperatorType.IN, ["1", "2"]),
             ("user_id属于['1', '2']", "cnl", OperatorType.IN, ["1", "2"]),
-        ]
-        for text, mode, op_enum, val in cases:
-            node = parser.parse_rule(text, mode=mode)
-            assert isinstance(node, Condition)
-            assert node.operator == op_enum
-            assert node.value == val
+        ],
+    )
+    def test_parse_operators(
+        self, parser: RuleEngineParser, text: str, mode: Literal["dsl", "cnl"], op_enum: OperatorType, val: Any
+    ):
+        node = parser.parse_rule(text, mode=mode)
+        assert isinstance(node, Condition)
+        assert node.operator == op_enum
+        assert node.value == val
+
+    def test_unknown_field_raises(self, parser: RuleEngineParser):
+        with pytest.raises(ValueError, match="Unknown field"):
+            parser.parse_rule("ocr > 1")
+
+    def test_parse_rule_cache(self):
+        parser = RuleEngineParser()
+        text = "author.level > 3 AND text contains 'a'"
+        first = parser.parse_rule(text)
+        assert isinstance(first, RuleGroup)
+        first.conditions.clear()
+
+        with patch.object(parser._parsers["dsl"][0], "parse_string") as mock_parse:
+            second = parser.parse_rule(text)
+            third = parser.parse_rule(text)
+        mock_parse.assert_not_called()
+        assert isinstance(second, RuleGroup)
+        assert len(second.conditions) == 2
+        assert second == third
+        assert second is not third
+
+    def test_parse_rule_cache_skips_time_dependent(self):
+        parser = RuleEngineParser()
+        parser.parse_rule("create_time > 1d AND text contains 'a'")
+        parser.parse_rule("内容包含'a'或内容包含'b'", mode="cnl", now=datetime.now(SHANGHAI_TZ))
+        assert not parser._rule_cache
+
+    def test_parse_rule_cache_eviction(self, monkeypatch):
+        monkeypatch.setattr("tiebameow.parser.rule_parser._RULE_CACHE_SIZE", 2)
+        parser = RuleEngineParser()
+        for text in ["text contains 'a'", "text contains 'b'", "text contains 'c'"]:
+            parser.parse_rule(text)
+        assert list(parser._rule_cache) == [("text contains 'b'", "dsl"), ("text contains 'c'", "dsl")]
+
+    def test_parse_rule_cache_shared_across_threads(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        # 容量远小于规则数，使各线程的命中与淘汰频繁交错
+        monkeypatch.setattr("tiebameow.parser.rule_parser._RULE_CACHE_SIZE", 2)
+        parser = RuleEngineParser()
+        texts = [f"text contains '{i % 5}'" for i in range(400)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            nodes = list(pool.map(parser.parse_rule, texts))
+        assert [node.value for node in nodes] == [str(i % 5) for i in range(400)]
+        assert len(parser._rule_cache) <= 2
 
     # === 2. Logic & Grouping Tests ===
 
@@ -115,47 +167,51 @@ class TestRuleEngineParserBasic:
 
     # === 3. Value Parsing Tests ===
 
-    def test_parse_values_types(self, parser: RuleEngineParser):
-        # String
-        r1 = parser.parse_rule("text == 'foo'", "dsl")
-        assert isinstance(r1, Condition)
-        assert r1.value == "foo"
-        # Integer
-        r2 = parser.parse_rule("agree_num == 42", "dsl")
-        assert isinstance(r2, Condition)
-        assert r2.value == 42
-        # Float
-        r3 = parser.parse_rule("agree_num == 3.45", "dsl")
-        assert isinstance(r3, Condition)
-        assert math.isclose(r3.value, 3.45)
-        # Bool
-        r4 = parser.parse_rule("is_good == false", "dsl")
-        assert isinstance(r4, Condition)
-        assert r4.value is False
-        # CNL Bool
-        r5 = parser.parse_rule("加精等于真", "cnl")
-        assert isinstance(r5, Condition)
-        assert r5.value is True
-        # List
-        r6 = parser.parse_rule("title in ['a', 'b']", "dsl")
-        assert isinstance(r6, Condition)
-        assert r6.value == ["a", "b"]
-        r7 = parser.parse_rule("标题属于['x', 'y']", "cnl")
-        assert isinstance(r7, Condition)
-        assert r7.value == ["x", "y"]
-        r8 = parser.parse_rule("author.user_id in [1, 'a']", "dsl")
-        assert isinstance(r8, Condition)
-        assert r8.value == [1, "a"]
-        r9 = parser.parse_rule("user_id属于【1, 2】", "cnl")
-        assert isinstance(r9, Condition)
-        assert r9.value == [1, 2]
+    @pytest.mark.parametrize(
+        ("text", "mode", "expected"),
+        [
+            # String
+            ("text == 'foo'", "dsl", "foo"),
+            # Integer
+            ("agree_num == 42", "dsl", 42),
+            # Float
+            ("agree_num == 3.45", "dsl", pytest.approx(3.45)),
+            # Bool
+            ("is_good == false", "dsl", False),
+            # CNL Bool
+            ("加精等于真", "cnl", True),
+            # List
+            ("title in ['a', 'b']", "dsl", ["a", "b"]),
+            ("标题属于['x', 'y']", "cnl", ["x", "y"]),
+            ("author.user_id in [1, 'a']", "dsl", [1, "a"]),
+            ("user_id属于【1, 2】", "cnl", [1, 2]),
+        ],
+    )
+    def test_parse_values_types(self, parser: RuleEngineParser, text: str, mode: Literal["dsl", "cnl"], expected: Any):
+        node = parser.parse_rule(text, mode)
+        assert isinstance(node, Condition)
+        assert node.value == expected
+        if isinstance(expected, bool):
+            assert node.value is expected
 
     # === 4. Validation & Actions ===
 
     def test_validate(self, parser: RuleEngineParser):
-        assert parser.validate("title contains 'test'", mode="dsl")[0]
-        assert not parser.validate("title contains", mode="dsl")[0]
-        assert not parser.validate("未知字段等于1", mode="cnl")[0]
+        assert parser.validate("title contains 'test'", mode="dsl") == (True, None)
+
+    @pytest.mark.parametrize(
+        ("text", "mode"),
+        [
+            ("title contains", "dsl"),
+            ("unknown_field == 1", "dsl"),
+            ("(title contains 'a'", "dsl"),
+            ("未知字段等于1", "cnl"),
+        ],
+    )
+    def test_validate_invalid(self, parser: RuleEngineParser, text: str, mode: Literal["dsl", "cnl"]):
+        valid, msg = parser.validate(text, mode=mode)
+        assert not valid
+        assert msg
 
     def test_parse_actions(self, parser: RuleEngineParser):
         dsl_text = "DO: delete(), ban(days=1)"
@@ -185,11 +241,18 @@ class TestRuleEngineParserBasic:
 
     # === 5. Dump & Scan ===
 
-    def test_dump_rule(self, parser: RuleEngineParser):
-        original = "(title contains 'A' AND author.level > 5)"
-        node = parser.parse_rule(original, mode="dsl")
-        dumped = parser.dump_rule(node, mode="dsl")
-        node2 = parser.parse_rule(dumped, mode="dsl")
+    @pytest.mark.parametrize(
+        ("original", "mode"),
+        [
+            ("(title contains 'A' AND author.level > 5)", "dsl"),
+            ("NOT (text contains 'spam' OR author.user_id in [1, 2])", "dsl"),
+            ("标题包含'A'并且(等级大于5或者回复数小于10)", "cnl"),
+        ],
+    )
+    def test_dump_rule(self, parser: RuleEngineParser, original: str, mode: Literal["dsl", "cnl"]):
+        node = parser.parse_rule(original, mode=mode)
+        dumped = parser.dump_rule(node, mode=mode)
+        node2 = parser.parse_rule(dumped, mode=mode)
         assert node == node2
 
     def test_dump_actions(self, parser: RuleEngineParser):
@@ -236,6 +299,22 @@ class TestRuleParserAdvancedAndConfig:
         # Should fallback to using the string directly
         assert "custom_field==1" in dumped.replace(" ", "")
 
+    def test_dump_deeply_nested(self, parser: RuleEngineParser):
+        leaf = Condition(field=FieldType.LEVEL, operator=OperatorType.GT, value=1)
+        node: Condition | RuleGroup = leaf
+        for _ in range(3):
+            node = RuleGroup(logic=LogicType.AND, conditions=[leaf, RuleGroup(logic=LogicType.NOT, conditions=[node])])
+        expected = "author.level>1"
+        for _ in range(3):
+            expected = f"(author.level>1 AND NOT ({expected}))"
+        assert parser.dump_rule(node, mode="dsl") == expected
+
+    def test_dump_str_valued_node(self, parser: RuleEngineParser):
+        # 未经校验构造时字段/操作符/逻辑可能是原始字符串，仍应映射到对应 Token
+        c = Condition.model_construct(field="author.level", operator="gt", value=3)
+        group = RuleGroup.model_construct(logic="NOT", conditions=[c])
+        assert parser.dump_rule(group, mode="cnl") == "非 (等级大于3)"
+
 
 class TestRuleParserDatetime:
     @pytest.mark.usefixtures("mock_now")
@@ -277,6 +356,23 @@ class TestRuleParserDatetime:
         assert isinstance(node, Condition)
         assert node.value == fixed_now
 
+    def test_relative_time_explicit_now(self, parser: RuleEngineParser, fixed_now):
+        node = parser.parse_rule("create_time in [1d, NOW]", mode="dsl", now=fixed_now)
+        assert isinstance(node, Condition)
+        assert node.value == [fixed_now - timedelta(days=1), fixed_now]
+
+    def test_relative_time_now_shared_within_parse(self, parser: RuleEngineParser, fixed_now):
+        with patch("tiebameow.parser.rule_parser.now_with_tz", return_value=fixed_now) as mock_now_with_tz:
+            node = parser.parse_rule("create_time > 2d AND last_time < 1h", mode="dsl")
+            assert mock_now_with_tz.call_count == 1
+            parser.parse_rule("create_time > 1d", mode="dsl")
+            assert mock_now_with_tz.call_count == 2
+        assert isinstance(node, RuleGroup)
+        assert [c.value for c in node.conditions if isinstance(c, Condition)] == [
+            fixed_now - timedelta(days=2),
+            fixed_now - timedelta(hours=1),
+        ]
+
     def test_dump_datetime(self, parser: RuleEngineParser):
         dt = datetime(2023, 1, 1, 0, 0, 0)
         cond = Condition(field=FieldType.CREATE_TIME, operator=OperatorType.GT, value=dt)
@@ -350,6 +446,13 @@ class TestRuleParserEdgeCasesAndCoverage:
         assert isinstance(node2, Condition)
         assert node2.value == fixed_now - timedelta(hours=15)
 
+    @pytest.mark.usefixtures("mock_now")
+    @pytest.mark.parametrize("rule", ["创建时间 大于 3天 前", "创建时间 大于 3 天 前", "创建时间大于3天前"])
+    def test_relative_time_cnl_suffix_whitespace(self, parser: RuleEngineParser, fixed_now, rule: str):
+        node = parser.parse_rule(rule, mode="cnl")
+        assert isinstance(node, Condition)
+        assert node.value == fixed_now - timedelta(days=3)
+
     def test_to_rule_node_list_compat(self, parser):
         item = {"field": ["title"], "op": ["=="], "val": "test"}
         node = parser._to_rule_node(item, DSL_CONFIG)
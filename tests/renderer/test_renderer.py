@@ -1,60 +1,91 @@
+import asyncio
+import base64
+import dataclasses
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.parse import parse_qs, urlsplit
 
+import jinja2
 import pytest
-import yarl
 
 from tiebameow.models.dto import CommentDTO, PostDTO, ThreadDTO, ThreadUserDTO
 from tiebameow.renderer import Renderer
 from tiebameow.renderer.config import RenderConfig
-from tiebameow.renderer.playwright_core import PlaywrightCore
-from tiebameow.renderer.style import FONT_URL, get_font_style
-from tiebameow.schemas.fragments import TypeFragText
+from tiebameow.renderer.playwright_core import CHROMIUM_LAUNCH_ARGS, MAX_IDLE_PAGES, PlaywrightCore
+from tiebameow.renderer.style import FONT_URL, get_font_bytes, get_font_style
 
 # --- Test PlaywrightCore ---
 
 
-@pytest.mark.asyncio
-async def test_playwright_core_lifecycle():
-    """Test launch and close lifecycle of PlaywrightCore."""
-    with patch("playwright.async_api.async_playwright") as mock_playwright_cls:
-        # Mock Context Manager for async_playwright()
-        mock_playwright_mgr = MagicMock()
-        mock_playwright_cls.return_value = mock_playwright_mgr
+@dataclasses.dataclass
+class PlaywrightMocks:
+    manager: MagicMock
+    playwright: AsyncMock
+    browser: AsyncMock
+    context: AsyncMock
 
-        # Mock the object returned by start()
-        mock_playwright_obj = AsyncMock()
-        # Ensure start() returns a coroutine that resolves to mock_playwright_obj
 
-        async def async_start():
-            return mock_playwright_obj
-
-        mock_playwright_mgr.start.side_effect = async_start
+@pytest.fixture
+def playwright_mocks():
+    """Patch async_playwright() so that start() resolves to a mocked Playwright with one chromium browser."""
+    with patch("playwright.async_api.async_playwright") as mock_playwright_cls:
+        mock_playwright_obj = AsyncMock()
+        mock_playwright_cls.return_value.start = AsyncMock(return_value=mock_playwright_obj)
 
         mock_browser = AsyncMock()
         mock_playwright_obj.chromium.launch.return_value = mock_browser
-
-        # Mock contexts
         mock_context = AsyncMock()
         mock_browser.new_context.return_value = mock_context
 
-        core = PlaywrightCore()
-        await core.launch()
+        yield PlaywrightMocks(mock_playwright_cls.return_value, mock_playwright_obj, mock_browser, mock_context)
 
-        assert core.playwright is not None
-        assert core.browser is not None
-        mock_playwright_obj.chromium.launch.assert_called_once()
 
-        # Helper to simulate context creation
-        await core._get_context("medium")
-        assert len(core.contexts) == 1
+@pytest.mark.asyncio
+async def test_playwright_core_lifecycle(playwright_mocks):
+    """Test launch and close lifecycle of PlaywrightCore."""
+    core = PlaywrightCore()
+    await core.launch()
 
-        await core.close()
-        mock_context.close.assert_called_once()
-        mock_browser.close.assert_called_once()
-        mock_playwright_obj.stop.assert_called_once()
-        assert core.browser is None
-        assert core.playwright is None
-        assert len(core.contexts) == 0
+    assert core.playwright is not None
+    assert core.browser is not None
+    playwright_mocks.playwright.chromium.launch.assert_called_once_with(args=CHROMIUM_LAUNCH_ARGS)
+
+    # Helper to simulate context creation
+    await core._get_context("medium")
+    assert len(core.contexts) == 1
+
+    await core.close()
+    playwright_mocks.context.close.assert_called_once()
+    playwright_mocks.browser.close.assert_called_once()
+    playwright_mocks.playwright.stop.assert_called_once()
+    assert core.browser is None
+    assert core.playwright is None
+    assert len(core.contexts) == 0
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_launch_once_across_renders(playwright_mocks):
+    """Concurrent renders on a cold core share one Playwright and browser launch."""
+
+    # 启动过程中让出事件循环，确保其余渲染在启动完成前就开始竞争
+    async def yielding_start():
+        await asyncio.sleep(0)
+        return playwright_mocks.playwright
+
+    playwright_mocks.manager.start.side_effect = yielding_start
+    mock_browser = AsyncMock()
+    playwright_mocks.playwright.firefox.launch.return_value = mock_browser
+
+    core = PlaywrightCore("firefox")
+    configs = [RenderConfig(quality=q) for q in ("low", "medium", "low", "medium", "high")]
+    await asyncio.gather(*(core.render("<html></html>", config) for config in configs))
+
+    playwright_mocks.manager.start.assert_called_once()
+    playwright_mocks.playwright.firefox.launch.assert_called_once_with()
+    # 每种渲染质量只创建一个上下文，后续渲染复用
+    assert mock_browser.new_context.call_count == 3
+
+    await core.close()
 
 
 @pytest.mark.asyncio
@@ -68,38 +99,57 @@ async def test_playwright_core_render():
     core.browser.new_context.return_value = mock_context
 
     mock_page = AsyncMock()
+    mock_page.evaluate.return_value = [500, 300]
     mock_context.new_page.return_value = mock_page
+    mock_cdp = AsyncMock()
+    mock_cdp.send.return_value = {"data": base64.b64encode(b"jpeg_bytes").decode()}
+    mock_context.new_cdp_session.return_value = mock_cdp
 
     config = RenderConfig(width=500, height=100, quality="medium")
     html = "<html>test</html>"
     request_handler = AsyncMock()
 
     # First render call - should create context
-    await core.render(html, config, request_handler=request_handler)
+    result = await core.render(html, config, request_handler=request_handler)
+    assert result == b"jpeg_bytes"
 
     core.browser.new_context.assert_called_once()
     mock_context.new_page.assert_called_once()
     mock_page.set_viewport_size.assert_called_with({"width": 500, "height": 100})
     mock_page.route.assert_called_with("http://tiebameow.local/**", request_handler)
-    mock_page.set_content.assert_called_with(html)
-    mock_page.wait_for_load_state.assert_called_with("networkidle")
-    mock_page.screenshot.assert_called()
-    mock_page.close.assert_called_once()
+    mock_page.set_content.assert_called_with(html, wait_until="load")
+    mock_page.wait_for_load_state.assert_not_called()
+    mock_page.evaluate.assert_any_call("() => document.fonts.ready.then(() => null)")
+    mock_context.new_cdp_session.assert_called_once_with(mock_page)
+    method, params = mock_cdp.send.call_args.args
+    assert method == "Page.captureScreenshot"
+    assert params["format"] == "jpeg"
+    assert params["quality"] == 80
+    assert params["optimizeForSpeed"] is True
+    assert params["clip"] == {"x": 0, "y": 0, "width": 500, "height": 300, "scale": 1}
+    mock_cdp.detach.assert_called_once()
+    mock_page.screenshot.assert_not_called()
+    mock_page.unroute.assert_called_with("http://tiebameow.local/**", request_handler)
+    # 渲染成功的页面被重置后放回空闲池而不是关闭
+    mock_page.goto.assert_called_with("about:blank")
+    mock_page.close.assert_not_called()
 
     # Second render call with same quality - should reuse context
     await core.render(html, config, request_handler=request_handler)
 
     # new_context should NOT be called again
     core.browser.new_context.assert_called_once()
-    # new_page SHOULD be called again
-    assert mock_context.new_page.call_count == 2
-    assert mock_page.close.call_count == 2
+    # the idle page should be reused instead of opening a new one
+    mock_context.new_page.assert_called_once()
+    assert core._idle_pages["medium", 0] == [mock_page]
 
     # Third render call with DIFFERENT quality - should create NEW context
     config_high = RenderConfig(width=500, height=100, quality="high")
     mock_context_high = AsyncMock()
     mock_page_high = AsyncMock()
+    mock_page_high.evaluate.return_value = [500, 300]
     mock_context_high.new_page.return_value = mock_page_high
+    mock_context_high.new_cdp_session.return_value = mock_cdp
 
     # Clear contexts to cleanly test new creation without side_effect complexity on existing mock
     core.contexts.clear()
@@ -111,6 +161,235 @@ async def test_playwright_core_render():
     core.browser.new_context.assert_called_once()
     call_kwargs = core.browser.new_context.call_args.kwargs
     assert call_kwargs["device_scale_factor"] == 2  # high quality scale
+    _, params = mock_cdp.send.call_args.args
+    assert params["format"] == "png"
+    assert "quality" not in params
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_page_pool_limits():
+    core = PlaywrightCore("firefox")
+    core.browser = AsyncMock()
+    mock_context = AsyncMock()
+    core.browser.new_context.return_value = mock_context
+
+    async def slow_set_content(*args, **kwargs):
+        await asyncio.sleep(0.01)
+
+    async def yielding_goto(*args, **kwargs):
+        await asyncio.sleep(0)
+
+    pages = [AsyncMock() for _ in range(MAX_IDLE_PAGES * 2)]
+    for page in pages:
+        page.set_content.side_effect = slow_set_content
+        # goto 让出事件循环，使并发归还的页面在放回池前交错执行
+        page.goto.side_effect = yielding_goto
+    mock_context.new_page.side_effect = pages
+    config = RenderConfig(quality="low")
+
+    # 并发渲染时每个渲染各占一个页面，超出池上限的页面被关闭
+    await asyncio.gather(*(core.render("<html></html>", config) for _ in pages))
+    assert mock_context.new_page.call_count == len(pages)
+    assert len(core._idle_pages["low", 0]) == MAX_IDLE_PAGES
+    assert sum(page.close.call_count for page in pages) == len(pages) - MAX_IDLE_PAGES
+
+    # 渲染失败的页面不会放回池中
+    failing = core._idle_pages["low", 0][-1]
+    failing.set_content.side_effect = Exception("boom")
+    with pytest.raises(Exception, match="boom"):
+        await core.render("<html></html>", config)
+    failing.close.assert_called_once()
+    assert failing not in core._idle_pages["low", 0]
+
+    await core.close()
+    assert not core._idle_pages
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_multi_browser_round_robin(playwright_mocks):
+    browsers = [AsyncMock(), AsyncMock()]
+    playwright_mocks.playwright.chromium.launch.side_effect = browsers
+    contexts = [AsyncMock(), AsyncMock()]
+    for browser, context in zip(browsers, contexts, strict=True):
+        browser.new_context.return_value = context
+        context.new_cdp_session.return_value.send.return_value = {"data": ""}
+        context.new_page.return_value.evaluate.return_value = [500, 100]
+
+    core = PlaywrightCore(browser_count=2)
+    await core.launch()
+    assert playwright_mocks.playwright.chromium.launch.call_count == 2
+
+    config = RenderConfig(quality="low")
+    for _ in range(4):
+        await core.render("<html></html>", config)
+
+    for context in contexts:
+        context.new_page.assert_called_once()
+        assert context.new_cdp_session.call_count == 2
+    assert set(core.contexts) == {("low", 0), ("low", 1)}
+
+    await core.close()
+    for browser in browsers:
+        browser.close.assert_called_once()
+    assert core.browser is None
+
+    with pytest.raises(ValueError, match="browser_count"):
+        PlaywrightCore(browser_count=0)
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_multi_browser_launch_failure(playwright_mocks):
+    """A failing extra browser launch closes the launched ones and leaves the core retryable."""
+    first = AsyncMock()
+    playwright_mocks.playwright.chromium.launch.side_effect = [first, RuntimeError("launch failed")]
+
+    core = PlaywrightCore(browser_count=2)
+    with pytest.raises(RuntimeError, match="launch failed"):
+        await core.launch()
+    first.close.assert_called_once()
+    assert core.browser is None
+    assert core._extra_browsers == []
+
+    browsers = [AsyncMock(), AsyncMock()]
+    playwright_mocks.playwright.chromium.launch.side_effect = browsers
+    await core.launch()
+    assert core.browser is browsers[0]
+    assert core._extra_browsers == [browsers[1]]
+    await core._get_context("low", slot=1)
+    browsers[1].new_context.assert_called_once()
+    await core.close()
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_blocks_external_resources():
+    core = PlaywrightCore()
+    core.browser = AsyncMock()
+    mock_context = AsyncMock()
+    core.browser.new_context.return_value = mock_context
+
+    await core._get_context("medium")
+    mock_context.route.assert_called_once_with("**/*", core._block_external)
+
+    for resource_type in ("image", "media", "font"):
+        mock_route = AsyncMock()
+        mock_route.request.resource_type = resource_type
+        await core._block_external(mock_route)
+        mock_route.abort.assert_called_once()
+        mock_route.continue_.assert_not_called()
+
+    mock_route = AsyncMock()
+    mock_route.request.resource_type = "stylesheet"
+    await core._block_external(mock_route)
+    mock_route.continue_.assert_called_once()
+    mock_route.abort.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_prepare():
+    core = PlaywrightCore("firefox")
+    core.browser = AsyncMock()
+    mock_context = AsyncMock()
+    core.browser.new_context.return_value = mock_context
+    mock_page = AsyncMock()
+    mock_context.new_page.return_value = mock_page
+
+    assert await core.prepare("medium") == 0
+    assert await core.prepare("medium") == 0
+
+    # 预热页面仅创建一次，并被随后的渲染直接取用
+    mock_context.new_page.assert_called_once()
+    assert core._idle_pages["medium", 0] == [mock_page]
+    await core.render("<html></html>", RenderConfig(quality="medium"), slot=0)
+    mock_context.new_page.assert_called_once()
+    mock_page.set_content.assert_called_once_with("<html></html>", wait_until="load")
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_prepare_limits():
+    core = PlaywrightCore("firefox", browser_count=2)
+    core.browser = AsyncMock()
+    extra_browser = AsyncMock()
+    core._extra_browsers = [extra_browser]
+    contexts = [AsyncMock(), AsyncMock()]
+    core.browser.new_context.return_value = contexts[0]
+    extra_browser.new_context.return_value = contexts[1]
+
+    created: dict[int, list[AsyncMock]] = {0: [], 1: []}
+
+    def make_new_page(slot):
+        async def new_page():
+            # new_page 让出事件循环，使并发预热在放入池前交错执行
+            await asyncio.sleep(0)
+            page = AsyncMock()
+            created[slot].append(page)
+            return page
+
+        return new_page
+
+    for slot, context in enumerate(contexts):
+        context.new_page.side_effect = make_new_page(slot)
+
+    # 每次预热各自预留一个浏览器，并返回其序号供渲染使用
+    slots = await asyncio.gather(*(core.prepare("low") for _ in range(MAX_IDLE_PAGES * 4)))
+    assert slots == [0, 1] * (MAX_IDLE_PAGES * 2)
+
+    # 并发预热不会使空闲池超出上限，多余的页面被关闭
+    for slot, pages in created.items():
+        assert len(pages) == MAX_IDLE_PAGES * 2
+        assert len(core._idle_pages["low", slot]) == MAX_IDLE_PAGES
+        assert sum(page.close.call_count for page in pages) == MAX_IDLE_PAGES
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_render_element_clip():
+    core = PlaywrightCore()
+    core.browser = AsyncMock()
+    mock_context = AsyncMock()
+    core.browser.new_context.return_value = mock_context
+    mock_page = AsyncMock()
+    mock_context.new_page.return_value = mock_page
+    mock_locator = MagicMock()
+    mock_locator.bounding_box = AsyncMock(return_value={"x": 10, "y": 20, "width": 300, "height": 400})
+    mock_page.locator = MagicMock(return_value=mock_locator)
+    mock_cdp = AsyncMock()
+    mock_cdp.send.return_value = {"data": base64.b64encode(b"png_bytes").decode()}
+    mock_context.new_cdp_session.return_value = mock_cdp
+
+    result = await core.render("<html></html>", RenderConfig(quality="high"), element=".container")
+
+    assert result == b"png_bytes"
+    mock_page.locator.assert_called_with(".container")
+    _, params = mock_cdp.send.call_args.args
+    assert params["clip"] == {"x": 10, "y": 20, "width": 300, "height": 400, "scale": 1}
+
+    mock_locator.bounding_box.return_value = None
+    with pytest.raises(ValueError, match="not visible"):
+        await core.render("<html></html>", RenderConfig(quality="high"), element=".container")
+
+
+@pytest.mark.asyncio
+async def test_playwright_core_render_non_chromium():
+    core = PlaywrightCore("firefox")
+    core.browser = AsyncMock()
+    mock_context = AsyncMock()
+    core.browser.new_context.return_value = mock_context
+    mock_page = AsyncMock()
+    mock_page.screenshot.return_value = b"firefox_bytes"
+    mock_context.new_page.return_value = mock_page
+
+    result = await core.render("<html></html>", RenderConfig(quality="medium"))
+
+    assert result == b"firefox_bytes"
+    mock_page.screenshot.assert_called_once_with(full_page=True, type="jpeg", quality=80)
+    mock_context.new_cdp_session.assert_not_called()
+
+
+def test_playwright_core_check_installed_cached():
+    PlaywrightCore.check_installed.cache_clear()
+    assert PlaywrightCore.check_installed() is True
+    with patch.dict("sys.modules", {"playwright": None}):
+        assert PlaywrightCore.check_installed() is True
+    PlaywrightCore.check_installed.cache_clear()
 
 
 # --- Test Renderer Virtual URL Generation ---
@@ -118,31 +397,34 @@ async def test_playwright_core_render():
 
 def test_renderer_get_portrait_url():
     url = Renderer._get_portrait_url("portrait_id", size="l")
-    parsed = yarl.URL(url)
+    parsed = urlsplit(url)
     assert parsed.scheme == "http"
-    assert parsed.host == "tiebameow.local"
+    assert parsed.netloc == "tiebameow.local"
     assert parsed.path == "/portrait"
-    assert parsed.query["id"] == "portrait_id"
-    assert parsed.query["size"] == "l"
+    query = parse_qs(parsed.query)
+    assert query["id"] == ["portrait_id"]
+    assert query["size"] == ["l"]
 
 
 def test_renderer_get_image_url():
     url = Renderer._get_image_url("image_hash", size="m")
-    parsed = yarl.URL(url)
+    parsed = urlsplit(url)
     assert parsed.scheme == "http"
-    assert parsed.host == "tiebameow.local"
+    assert parsed.netloc == "tiebameow.local"
     assert parsed.path == "/image"
-    assert parsed.query["hash"] == "image_hash"
-    assert parsed.query["size"] == "m"
+    query = parse_qs(parsed.query)
+    assert query["hash"] == ["image_hash"]
+    assert query["size"] == ["m"]
 
 
 def test_renderer_get_forum_icon_url():
     url = Renderer._get_forum_icon_url("forum_name")
-    parsed = yarl.URL(url)
+    parsed = urlsplit(url)
     assert parsed.scheme == "http"
-    assert parsed.host == "tiebameow.local"
+    assert parsed.netloc == "tiebameow.local"
     assert parsed.path == "/forum"
-    assert parsed.query["fname"] == "forum_name"
+    query = parse_qs(parsed.query)
+    assert query["fname"] == ["forum_name"]
 
 
 # --- Test Renderer Core Functionality ---
@@ -154,35 +436,69 @@ def mock_playwright_core_cls():
         yield mock
 
 
+def _make_route(url: str = "") -> AsyncMock:
+    # request 只读取属性，用 MagicMock 代替 AsyncMock 自动生成的子对象
+    route = AsyncMock()
+    route.request = MagicMock(url=url)
+    return route
+
+
 @pytest.fixture
-def renderer(mock_playwright_core_cls):
-    with patch("tiebameow.renderer.renderer.Client") as _:
-        r = Renderer()
-        r.core = AsyncMock(spec=PlaywrightCore)
-        r.core.render = AsyncMock(return_value=b"image_bytes")
-        return r
+def mock_route():
+    return _make_route()
+
+
+@pytest.fixture
+def renderer():
+    # 直接传入客户端并替换渲染核心，无需逐个测试 patch 模块内的 Client 与 PlaywrightCore
+    r = Renderer(client=MagicMock())
+    r.core = AsyncMock()
+    r.core.render = AsyncMock(return_value=b"image_bytes")
+    return r
 
 
 @pytest.mark.asyncio
 async def test_renderer_render_image(renderer):
     # Mock jinja2
-    mock_template = AsyncMock()
-    mock_template.render_async.return_value = "<html></html>"
-    renderer.env.get_template = MagicMock(return_value=mock_template)
-
-    await renderer._render_image("test.html", data={})
-
-    renderer.env.get_template.assert_called_with("test.html")
-    mock_template.render_async.assert_called()
+    mock_template = MagicMock()
+    mock_template.render.return_value = "<html></html>"
+    with patch.object(renderer.env, "get_template", MagicMock(return_value=mock_template)) as mock_get_template:
+        await renderer._render_image("test.html", data={})
+
+    mock_get_template.assert_called_with("test.html")
+    mock_template.render.assert_called()
+    renderer.core.prepare.assert_called_once_with("medium")
     renderer.core.render.assert_called_once()
+    assert renderer.core.render.call_args.args == ("<html></html>", renderer.config)
     # Check if request_handler was passed
     call_kwargs = renderer.core.render.call_args.kwargs
     assert call_kwargs["request_handler"] == renderer._handle_route
+    # 渲染使用预热时选定的浏览器
+    assert call_kwargs["slot"] == renderer.core.prepare.return_value
 
 
 @pytest.mark.asyncio
-async def test_renderer_build_content_context(renderer):
-    thread_dto = ThreadDTO.model_construct(
+async def test_renderer_render_image_template_error_first(renderer):
+    renderer.core.prepare.side_effect = RuntimeError("launch failed")
+    with (
+        patch.object(renderer, "_render_html", MagicMock(side_effect=jinja2.TemplateError("bad template"))),
+        pytest.raises(jinja2.TemplateError, match="bad template"),
+    ):
+        await renderer._render_image("test.html", data={})
+    renderer.core.render.assert_not_called()
+
+    # 模板正常时预热错误照常抛出
+    with (
+        patch.object(renderer, "_render_html", MagicMock(return_value="<html></html>")),
+        pytest.raises(RuntimeError, match="launch failed"),
+    ):
+        await renderer._render_image("test.html", data={})
+
+
+@pytest.fixture(scope="module")
+def sample_thread_dto():
+    """只读的贴子 DTO，供不修改它的测试共享。"""
+    dto = ThreadDTO.model_construct(
         tid=123,
         pid=456,
         author=ThreadUserDTO.model_construct(
@@ -190,16 +506,16 @@ async def test_renderer_build_content_context(renderer):
         ),
         title="Test Thread",
         create_time=1700000000,
-        contents=[
-            MagicMock(spec=TypeFragText, type=1, text="Content Text", to_proto=lambda: ""),
-        ],
-        images=[MagicMock(hash="hash1"), MagicMock(hash="hash2")],
+        # _build_content_context 只按 TypeFragText 协议读取 text 属性
+        contents=[SimpleNamespace(text="Content Text")],
     )
+    # 直接写入 cached_property 的缓存值，无需构造完整的图片片段
+    dto.__dict__["images"] = [SimpleNamespace(hash="hash1"), SimpleNamespace(hash="hash2")]
+    return dto
+
 
-    # Since we use model_construct and cached_property, we need to manually set the images property or let it compute
-    # It's easier to patch the images property for the DTO since it is a cached property relying on contents
-    with patch.object(ThreadDTO, "images", [MagicMock(hash="hash1"), MagicMock(hash="hash2")]):
-        ctx = await renderer._build_content_context(thread_dto, max_image_count=1)
+def test_renderer_build_content_context(renderer, sample_thread_dto):
+    ctx = renderer._build_content_context(sample_thread_dto, max_image_count=1)
 
     assert ctx["tid"] == 123
     assert ctx["text"] == "Content Text"
@@ -212,67 +528,89 @@ async def test_renderer_build_content_context(renderer):
 
 
 @pytest.mark.asyncio
-async def test_handle_route_font(renderer):
+@pytest.mark.parametrize(("font_bytes", "expected_method"), [(b"woff2", "fulfill"), (None, "abort")])
+async def test_handle_route_font(renderer, mock_route, font_bytes, expected_method):
     """Test font route interception."""
-    mock_route = AsyncMock()
     mock_route.request.url = FONT_URL
 
-    with patch("tiebameow.renderer.renderer.font_path") as mock_path:
-        mock_path.exists.return_value = True
+    with patch("tiebameow.renderer.renderer.get_font_bytes", return_value=font_bytes):
         await renderer._handle_route(mock_route)
-        mock_route.fulfill.assert_called_with(path=mock_path)
 
-        mock_path.exists.return_value = False
-        await renderer._handle_route(mock_route)
-        mock_route.abort.assert_called()
+    getattr(mock_route, expected_method).assert_called_once()
+    if font_bytes is not None:
+        mock_route.fulfill.assert_called_with(body=font_bytes, content_type="font/woff2")
+    else:
+        mock_route.fulfill.assert_not_called()
 
 
-@pytest.mark.asyncio
-async def test_handle_route_portrait(renderer):
-    """Test portrait proxying."""
-    mock_route = AsyncMock()
-    mock_route.request.url = "http://tiebameow.local/portrait?id=pid&size=s"
+def test_get_font_bytes_cached():
+    get_font_bytes.cache_clear()
+    with patch("pathlib.Path.read_bytes", return_value=b"woff2") as mock_read:
+        with patch("pathlib.Path.exists", return_value=True):
+            assert get_font_bytes() == b"woff2"
+            assert get_font_bytes() == b"woff2"
+    mock_read.assert_called_once()
+    get_font_bytes.cache_clear()
+
+    with patch("pathlib.Path.exists", return_value=False):
+        assert get_font_bytes() is None
+    get_font_bytes.cache_clear()
 
-    mock_resp = AsyncMock()
-    mock_resp.data = b"portrait_data"
-    renderer.client.get_image_bytes = AsyncMock(return_value=mock_resp)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("url", "expected_in_fetch_url"),
+    [
+        ("http://tiebameow.local/portrait?id=pid&size=s", "/sys/portraitn/item/pid"),
+        ("http://tiebameow.local/portrait?id=pid&size=l", "/sys/portraith/item/pid"),
+        (
+            "http://tiebameow.local/image?hash=hash123&size=s",
+            "imgsrc.baidu.com/forum/w=720;q=60;g=0/sign=__/hash123.jpg",
+        ),
+        ("http://tiebameow.local/image?hash=h&size=m", "w=960"),
+        ("http://tiebameow.local/image?hash=h&size=l", "/forum/pic/item/h.jpg"),
+    ],
+)
+async def test_handle_route_proxy(renderer, mock_route, url, expected_in_fetch_url):
+    """Test portrait and image proxying to baidu."""
+    mock_route.request.url = url
+    renderer.client.get_image_bytes = AsyncMock(return_value=AsyncMock(data=b"image_data"))
 
     await renderer._handle_route(mock_route)
 
-    renderer.client.get_image_bytes.assert_called()
-    # Verify the proxied URL points to baidu
-    args, _ = renderer.client.get_image_bytes.call_args
-    assert "sys/portraitn/item/pid" in str(args[0])
-    mock_route.fulfill.assert_called_with(body=b"portrait_data")
+    (fetch_url,), _ = renderer.client.get_image_bytes.call_args
+    assert expected_in_fetch_url in str(fetch_url)
+    mock_route.fulfill.assert_called_once_with(body=b"image_data")
 
 
 @pytest.mark.asyncio
-async def test_handle_route_image(renderer):
-    """Test image proxying."""
-    mock_route = AsyncMock()
-    mock_route.request.url = "http://tiebameow.local/image?hash=hash123&size=s"
-
-    mock_resp = AsyncMock()
-    mock_resp.data = b"image_data"
-    renderer.client.get_image_bytes = AsyncMock(return_value=mock_resp)
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://tiebameow.local/portrait",
+        "http://tiebameow.local/image",
+        "http://tiebameow.local/image?hash=h&size=xxx",
+        "http://tiebameow.local/forum",
+        "http://tiebameow.local/forum?fname=test",
+    ],
+)
+async def test_handle_route_abort(renderer, mock_route, url):
+    """Test aborting on missing params, unknown size or forum without avatar."""
+    mock_route.request.url = url
+    renderer.client.get_forum = AsyncMock(return_value=SimpleNamespace(small_avatar=""))
 
     await renderer._handle_route(mock_route)
 
-    renderer.client.get_image_bytes.assert_called()
-    args, _ = renderer.client.get_image_bytes.call_args
-    assert "imgsrc.baidu.com" in str(args[0])
-    assert "hash123" in str(args[0])
-    mock_route.fulfill.assert_called_with(body=b"image_data")
+    mock_route.abort.assert_called_once()
+    mock_route.fulfill.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_handle_route_forum_icon(renderer):
+async def test_handle_route_forum_icon(renderer, mock_route):
     """Test forum icon proxying."""
-    mock_route = AsyncMock()
     mock_route.request.url = "http://tiebameow.local/forum?fname=test_forum"
 
-    mock_forum_info = MagicMock()
-    mock_forum_info.small_avatar = "http://icon.url"
+    mock_forum_info = SimpleNamespace(small_avatar="http://icon.url")
     renderer.client.get_forum = AsyncMock(return_value=mock_forum_info)
 
     mock_resp = AsyncMock()
@@ -287,9 +625,8 @@ async def test_handle_route_forum_icon(renderer):
 
 
 @pytest.mark.asyncio
-async def test_handle_route_external(renderer):
+async def test_handle_route_external(renderer, mock_route):
     """Test ignoring non-local domains."""
-    mock_route = AsyncMock()
     mock_route.request.url = "http://google.com/something"
 
     await renderer._handle_route(mock_route)
@@ -297,9 +634,8 @@ async def test_handle_route_external(renderer):
 
 
 @pytest.mark.asyncio
-async def test_handle_route_error(renderer):
+async def test_handle_route_error(renderer, mock_route):
     """Test exception handling in route handler."""
-    mock_route = AsyncMock()
     mock_route.request.url = "http://tiebameow.local/image?hash=bad"
 
     renderer.client.get_image_bytes.side_effect = Exception("Network Error")
@@ -321,8 +657,7 @@ async def test_render_content_thread(renderer):
     # Patch convert methods if needed, but here we pass DTO
     # Need to patch _render_image to verify it's called
     with patch.object(renderer, "_render_image", AsyncMock(return_value=b"png")) as mock_render:
-        mock_forum_info = MagicMock()
-        mock_forum_info.small_avatar = "http://avatar"
+        mock_forum_info = SimpleNamespace(small_avatar="http://avatar")
         renderer.client.get_forum = AsyncMock(return_value=mock_forum_info)
 
         await renderer.render_content(thread_dto, title="Override Title")
@@ -428,6 +763,20 @@ async def test_text_to_image(renderer):
         assert mock_render.call_args.kwargs["element"] == ".container"
 
 
+@pytest.mark.asyncio
+async def test_text_to_image_config_override(renderer):
+    with patch.object(renderer, "_render_image", AsyncMock(return_value=b"png")) as mock_render:
+        await renderer.text_to_image("Hello")
+        assert mock_render.call_args.kwargs["config"] is renderer.config
+
+        await renderer.text_to_image("Hello", width=800, quality="high")
+        config = mock_render.call_args.kwargs["config"]
+        assert config.width == 800
+        assert config.quality == "high"
+        assert config.height == renderer.config.height
+        assert renderer.config.width == 500
+
+
 @pytest.mark.asyncio
 async def test_renderer_context_manager():
     # Test own client lifecycle
@@ -446,6 +795,34 @@ async def test_renderer_context_manager():
         r.core.close.assert_called()
 
 
+@pytest.mark.asyncio
+async def test_renderer_precompiles_builtin_templates():
+    from tiebameow.renderer.renderer import _ENTRY_TEMPLATES
+
+    r = Renderer(client=AsyncMock())
+    r.core = AsyncMock()
+    assert r.env.auto_reload is False
+
+    with patch.object(r.env, "get_template", wraps=r.env.get_template) as mock_get_template:
+        async with r:
+            pass
+
+    assert [c.args[0] for c in mock_get_template.call_args_list] == list(_ENTRY_TEMPLATES)
+
+
+def test_renderer_template_memo(tmp_path):
+    r = Renderer(client=AsyncMock())
+    with patch.object(r.env, "get_template", wraps=r.env.get_template) as mock_get_template:
+        assert r._get_template("thread.html") is r._get_template("thread.html")
+    mock_get_template.assert_called_once_with("thread.html")
+
+    # 自定义模板目录保持热重载，不在实例上缓存模板
+    (tmp_path / "custom.html").write_text("v1")
+    custom = Renderer(client=AsyncMock(), template_dir=tmp_path)
+    assert custom._render_html("custom.html", {}) == "v1"
+    assert not custom._templates
+
+
 @pytest.mark.asyncio
 async def test_renderer_context_manager_external_client():
     # Test external client lifecycle - should DOES NOT call enter/exit
@@ -495,78 +872,159 @@ async def test_renderer_custom_template_dir(tmp_path):
     r = Renderer(template_dir=tmp_path)
     # Check loader type
     assert r.env.loader.__class__.__name__ == "FileSystemLoader"
+    assert r.env.filters["format_date"] is not None
 
 
-@pytest.mark.asyncio
-async def test_handle_route_portrait_large(renderer):
-    mock_route = AsyncMock()
-    mock_route.request.url = "http://tiebameow.local/portrait?id=pid&size=l"
-    mock_resp = AsyncMock(data=b"data")
-    renderer.client.get_image_bytes = AsyncMock(return_value=mock_resp)
+def test_renderer_shares_default_env(mock_playwright_core_cls):
+    with patch("tiebameow.renderer.renderer.Client"):
+        r1 = Renderer()
+        r2 = Renderer()
+    assert r1.env is r2.env
 
-    await renderer._handle_route(mock_route)
 
-    args, _ = renderer.client.get_image_bytes.call_args
-    assert "/sys/portraith/item/pid" in str(args[0])
+def test_default_env_bytecode_cache():
+    import jinja2
+
+    from tiebameow.renderer.renderer import _create_bytecode_cache, _get_default_env
+
+    assert _get_default_env() is _get_default_env()
+    assert isinstance(_get_default_env().bytecode_cache, jinja2.FileSystemBytecodeCache)
+    with patch("jinja2.FileSystemBytecodeCache", side_effect=RuntimeError("unsafe dir")):
+        assert _create_bytecode_cache() is None
+
+
+def test_default_env_created_lazily(mock_playwright_core_cls, tmp_path):
+    from tiebameow.renderer.renderer import _get_default_env
+
+    _get_default_env.cache_clear()
+    with patch("tiebameow.renderer.renderer.Client"):
+        Renderer(template_dir=tmp_path)
+        assert _get_default_env.cache_info().currsize == 0
+        Renderer()
+    assert _get_default_env.cache_info().currsize == 1
 
 
 @pytest.mark.asyncio
-async def test_handle_route_image_sizes(renderer):
-    # Test M size
-    mock_route = AsyncMock()
-    mock_route.request.url = "http://tiebameow.local/image?hash=h&size=m"
-    renderer.client.get_image_bytes = AsyncMock(return_value=AsyncMock(data=b"d"))
-    await renderer._handle_route(mock_route)
-    assert "w=960" in str(renderer.client.get_image_bytes.call_args[0][0])
+async def test_handle_route_asset_cache(renderer, mock_route):
+    renderer.client.get_image_bytes = AsyncMock(return_value=AsyncMock(data=b"portrait"))
+    mock_info = SimpleNamespace(small_avatar="http://icon.url")
+    renderer.client.get_forum = AsyncMock(return_value=mock_info)
 
-    # Test L size
-    mock_route.request.url = "http://tiebameow.local/image?hash=h&size=l"
-    await renderer._handle_route(mock_route)
-    assert "/forum/pic/item/h.jpg" in str(renderer.client.get_image_bytes.call_args[0][0])
+    for _ in range(2):
+        mock_route.request.url = "http://tiebameow.local/portrait?id=pid&size=s"
+        await renderer._handle_route(mock_route)
+        mock_route.request.url = "http://tiebameow.local/forum?fname=test"
+        await renderer._handle_route(mock_route)
 
-    # Test unknown size -> abort
-    mock_route.request.url = "http://tiebameow.local/image?hash=h&size=xxx"
-    mock_route.abort.reset_mock()
+    # 头像与吧头像仅各获取一次
+    assert renderer.client.get_image_bytes.call_count == 2
+    renderer.client.get_forum.assert_called_once_with("test")
+    mock_route.fulfill.assert_called_with(body=b"portrait")
+
+    # 原图不进入缓存
+    mock_route.request.url = "http://tiebameow.local/image?hash=h&size=s"
     await renderer._handle_route(mock_route)
-    mock_route.abort.assert_called()
+    await renderer._handle_route(mock_route)
+    assert renderer.client.get_image_bytes.call_count == 4
 
 
 @pytest.mark.asyncio
-async def test_handle_route_missing_params(renderer):
-    mock_route = AsyncMock()
+async def test_handle_route_empty_image_not_cached(renderer, mock_route):
+    mock_route.request.url = "http://tiebameow.local/portrait?id=pid&size=s"
+    renderer.client.get_image_bytes = AsyncMock(return_value=AsyncMock(data=b""))
 
-    # Missing portrait id
-    mock_route.request.url = "http://tiebameow.local/portrait"
     await renderer._handle_route(mock_route)
-    mock_route.abort.assert_called()
 
-    # Missing image hash
-    mock_route.request.url = "http://tiebameow.local/image"
-    mock_route.abort.reset_mock()
-    await renderer._handle_route(mock_route)
-    mock_route.abort.assert_called()
+    mock_route.abort.assert_called_once()
+    mock_route.fulfill.assert_not_called()
+    assert not renderer._asset_cache
 
-    # Missing forum fname
-    mock_route.request.url = "http://tiebameow.local/forum"
-    mock_route.abort.reset_mock()
-    await renderer._handle_route(mock_route)
-    mock_route.abort.assert_called()
+
+@pytest.mark.asyncio
+async def test_fetch_cached_dedup_and_errors(renderer):
+    started = asyncio.Event()
+    release = asyncio.Event()
+    fetch = MagicMock()
+
+    async def slow_fetch() -> bytes:
+        fetch()
+        started.set()
+        await release.wait()
+        return b"data"
+
+    tasks = [asyncio.create_task(renderer._fetch_cached("k", slow_fetch)) for _ in range(3)]
+    await started.wait()
+    release.set()
+    assert await asyncio.gather(*tasks) == [b"data"] * 3
+    fetch.assert_called_once()
+    assert not renderer._asset_pending
+
+    failing = AsyncMock(side_effect=[Exception("boom"), b"ok"])
+    with pytest.raises(Exception, match="boom"):
+        await renderer._fetch_cached("e", failing)
+    assert await renderer._fetch_cached("e", failing) == b"ok"
 
 
 @pytest.mark.asyncio
-async def test_handle_route_forum_no_avatar(renderer):
-    mock_route = AsyncMock()
-    mock_route.request.url = "http://tiebameow.local/forum?fname=test"
+async def test_handle_route_image_coalesced(renderer):
+    release = asyncio.Event()
 
-    mock_info = MagicMock()
-    mock_info.small_avatar = ""
-    renderer.client.get_forum = AsyncMock(return_value=mock_info)
+    async def slow_get(url):
+        await release.wait()
+        return AsyncMock(data=b"image")
 
-    await renderer._handle_route(mock_route)
-    mock_route.abort.assert_called()
+    renderer.client.get_image_bytes = AsyncMock(side_effect=slow_get)
+    routes = [_make_route("http://tiebameow.local/image?hash=h&size=s") for _ in range(3)]
+
+    tasks = [asyncio.create_task(renderer._handle_route(route)) for route in routes]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    renderer.client.get_image_bytes.assert_called_once()
+    for route in routes:
+        route.fulfill.assert_called_once_with(body=b"image")
+    assert not renderer._asset_cache
+
+
+@pytest.mark.asyncio
+async def test_handle_route_leader_cancelled(renderer):
+    started = asyncio.Event()
+
+    async def hanging_get(url):
+        started.set()
+        await asyncio.Event().wait()
+
+    renderer.client.get_image_bytes = AsyncMock(side_effect=hanging_get)
+    leader_route, waiter_route = (_make_route("http://tiebameow.local/image?hash=h&size=s") for _ in range(2))
+
+    leader = asyncio.create_task(renderer._handle_route(leader_route))
+    await started.wait()
+    waiter = asyncio.create_task(renderer._handle_route(waiter_route))
+    await asyncio.sleep(0)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    await waiter
+
+    waiter_route.abort.assert_called_once()
+    waiter_route.fulfill.assert_not_called()
+    assert not renderer._asset_pending
+
+
+@pytest.mark.asyncio
+async def test_fetch_cached_eviction(renderer):
+    with patch("tiebameow.renderer.renderer._ASSET_CACHE_SIZE", 2):
+        for key in ("a", "b"):
+            await renderer._fetch_cached(key, AsyncMock(return_value=key.encode()))
+        await renderer._fetch_cached("a", AsyncMock())
+        await renderer._fetch_cached("c", AsyncMock(return_value=b"c"))
+
+    assert list(renderer._asset_cache) == ["a", "c"]
 
 
 def test_get_font_style_not_exists():
+    get_font_style.cache_clear()
     with patch("pathlib.Path.exists", return_value=False):
         style = get_font_style(16)
         assert "<style>" in style
@@ -576,7 +1034,12 @@ def test_get_font_style_not_exists():
 
 
 def test_get_font_style_exists():
-    with patch("pathlib.Path.exists", return_value=True):
+    get_font_style.cache_clear()
+    with patch("pathlib.Path.exists", return_value=True) as mock_exists:
         style = get_font_style(16)
         assert "<style>" in style
         assert "@font-face" in style
+
+        assert get_font_style(16) is style
+        mock_exists.assert_called_once()
+    get_font_style.cache_clear()
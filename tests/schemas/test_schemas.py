@@ -1,7 +1,7 @@
 from typing import Any, cast
 
 import pytest
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from tiebameow.schemas.fragments import (
     FragAtModel,
@@ -25,6 +25,7 @@ from tiebameow.schemas.rules import (
     OperatorType,
     ReviewRule,
     RuleGroup,
+    RuleNode,
     TargetType,
 )
 
@@ -134,6 +135,28 @@ def test_rule_group_nested() -> None:
     assert isinstance(outer_group.conditions[0], RuleGroup)
 
 
+def test_rule_node_discriminator() -> None:
+    adapter: TypeAdapter[RuleNode] = TypeAdapter(RuleNode)
+    data = {
+        "logic": "AND",
+        "conditions": [
+            {"field": "text", "operator": "contains", "value": "spam"},
+            {"logic": "NOT", "conditions": [{"field": "author.level", "operator": "lt", "value": 3}]},
+        ],
+    }
+    node = adapter.validate_python(data)
+    assert isinstance(node, RuleGroup)
+    assert isinstance(node.conditions[0], Condition)
+    assert isinstance(node.conditions[1], RuleGroup)
+    # 判别器不引入额外的标签字段，存储格式保持不变
+    assert adapter.dump_python(node, mode="json") == data
+
+    # 判别为规则组后只按 RuleGroup 校验，错误不再混杂 Condition 的字段
+    with pytest.raises(ValidationError) as exc_info:
+        adapter.validate_python({"logic": "AND"})
+    assert all(err["loc"][0] == "group" for err in exc_info.value.errors())
+
+
 def test_actions_model() -> None:
     actions = Actions(delete=DeleteAction(enabled=True))
     assert actions.delete.enabled is True
@@ -304,6 +327,34 @@ def test_validate_trigger_compatibility() -> None:
         )
     assert "Field 'title' is not valid for target_type 'post'" in str(exc.value)
 
+    # 7. 多个非法字段时报告首个出现的字段，函数调用字段不参与检查
+    group_multi = RuleGroup(
+        logic=LogicType.OR,
+        conditions=[
+            Condition(field=FunctionCall(name="ocr"), operator=OperatorType.CONTAINS, value="a"),
+            RuleGroup(
+                logic=LogicType.AND,
+                conditions=[Condition(field=FieldType.VIEW_NUM, operator=OperatorType.GT, value=1)],
+            ),
+            Condition(field=FieldType.REPLY_NUM, operator=OperatorType.GT, value=1),
+        ],
+    )
+    with pytest.raises(ValidationError) as exc:
+        ReviewRule(
+            id=7,
+            fid=123,
+            forum_rule_id=7,
+            uploader_id=456,
+            target_type=TargetType.COMMENT,
+            name="multi rule",
+            enabled=True,
+            block=False,
+            priority=10,
+            trigger=group_multi,
+            actions=actions,
+        )
+    assert "Field 'view_num' is not valid for target_type 'comment'" in str(exc.value)
+
 
 # --- FunctionCall Tests ---
 